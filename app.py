@@ -4,107 +4,440 @@ Main Flask application
 """
 
 import os
+import atexit
+import hashlib
+import queue
+import logging
+import shutil
 import tempfile
 import time
+import threading
+import fastjsonschema
+import orjson
 import requests
-from flask import Flask, render_template, request, jsonify
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, render_template, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from dotenv import load_dotenv
-from werkzeug.utils import secure_filename
+from flask_compress import Compress
+from werkzeug.exceptions import HTTPException
+
+# Load environment variables before the analysis modules read their settings
+from utils import load_env
+load_env()
 
 # Import our analysis modules
-from utils.exif_analyzer import extract_exif
+from utils.exif_analyzer import extract_exif, NO_EXIF_RESULT
 from utils.reverse_search import search_image
-from utils.c2pa_checker import check_c2pa
-from utils.llm_synthesizer import synthesize_analysis, generate_outreach as generate_outreach_message
+from utils.c2pa_checker import check_c2pa, NO_MANIFEST_RESULT
+from utils.jpeg_scanner import scan_jpeg
+from utils.llm_synthesizer import (
+    init_clients, cache_context, rules_analysis, synthesize_analysis,
+    generate_outreach as generate_outreach_message
+)
+from utils.llm_cache import create_cache
+from utils.image_hash import image_dhash, PerceptualCache
+from utils.image_source import ImageSource
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (native encoder/decoder)"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
-# Load environment variables
-load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)  # Used by jsonify() and request.json
+app.logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_FILE_SIZE', 10485760))  # 10MB default
 
 # Enable CORS for API endpoints
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# Compress JSON/HTML/JS/CSS responses (brotli preferred, gzip fallback)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 6      # gzip
+app.config['COMPRESS_BR_LEVEL'] = 4   # brotli - cheap per-response setting
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
+
 # Configuration
 ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif'}
+ALLOWED_SUFFIXES = tuple('.' + ext for ext in ALLOWED_EXTENSIONS)
+# Leading bytes of each supported image format
+IMAGE_MAGIC = (
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif')
+)
+# MIME type of each sniffed format - taken from the bytes, never from the
+# client's filename or the server's Content-Type header
+IMAGE_MIME_TYPES = {
+    'jpg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif'
+}
+COPY_BUFFER_SIZE = 1 << 20  # 1 MiB - fewer syscalls when writing temp files
+# Images up to this size are analyzed from memory; larger ones spill to a temp file
+IN_MEMORY_MAX_SIZE = int(os.getenv('IN_MEMORY_MAX_SIZE', 2621440))  # 2.5MB default
+
+# Request body schema for /api/generate-outreach, compiled once at import
+validate_outreach_request = fastjsonschema.compile({
+    'type': 'object',
+    'required': ['owner_info', 'license_params'],
+    'properties': {
+        'owner_info': {
+            'type': 'object',
+            'required': ['username', 'platform']
+        },
+        'license_params': {
+            'type': 'object',
+            'required': ['use_case', 'scope', 'territory', 'compensation']
+        },
+        'your_name': {'type': 'string'},
+        'your_organization': {'type': 'string'}
+    }
+})
+
+# Pooled HTTP session for image downloads (keep-alive + connection reuse)
+http_session = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+http_session.mount('https://', _http_adapter)
+http_session.mount('http://', _http_adapter)
+
+# Reverse search results keyed by perceptual hash (re-hosted/resized copies hit)
+reverse_search_cache = PerceptualCache(max_distance=int(os.getenv('PHASH_MAX_DISTANCE', 6)))
+
+# Create the shared OpenAI client up front (connection pool reused by every request)
+init_clients()
+
+# Shared LLM response cache (exact hash + optional semantic lookup)
+llm_cache = create_cache()
 
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
+
+
+def sniff_image_type(head):
+    """
+    Identify image format from its leading bytes
+
+    Args:
+        head: First bytes of the file (16 is plenty)
+
+    Returns:
+        str: 'jpg', 'png' or 'gif', or None if not a supported image
+    """
+    for magic, image_type in IMAGE_MAGIC:
+        if head.startswith(magic):
+            return image_type
+    return None
+
 
+def _read_up_to(stream, limit):
+    """
+    Read at most limit bytes from a stream
+
+    Args:
+        stream: Readable binary stream
+        limit: Maximum number of bytes to read
 
-def save_uploaded_file(file):
+    Returns:
+        bytes: Data read (shorter than limit only at end of stream)
+    """
+    chunks = []
+    total = 0
+    while total < limit:
+        chunk = stream.read(min(COPY_BUFFER_SIZE, limit - total))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        total += len(chunk)
+    return b''.join(chunks)
+
+
+def read_uploaded_file(file):
+    """
+    Load uploaded file into memory, spilling to a temp file if it is large
+
+    Args:
+        file: Flask uploaded file object
+
+    Returns:
+        tuple: (image_bytes, temp_path, mime_type) - exactly one of
+        image_bytes / temp_path is set; mime_type is sniffed from the content
+
+    Raises:
+        ValueError: If the file content is not a supported image
+    """
+    data = _read_up_to(file.stream, IN_MEMORY_MAX_SIZE + 1)
+    image_type = sniff_image_type(data[:16])
+    if not image_type:
+        raise ValueError("File content is not a JPEG, PNG or GIF image")
+
+    if len(data) <= IN_MEMORY_MAX_SIZE:
+        return data, None, IMAGE_MIME_TYPES[image_type]
+
+    file.stream.seek(0)
+    return None, save_uploaded_file(file, image_type), IMAGE_MIME_TYPES[image_type]
+
+
+def save_uploaded_file(file, image_type):
     """
     Save uploaded file to temp location
 
     Args:
         file: Flask uploaded file object
+        image_type: str - Sniffed format ('jpg', 'png' or 'gif')
 
     Returns:
         str: Path to temporary file
     """
-    suffix = os.path.splitext(secure_filename(file.filename))[1]
+    # Suffix only - tempfile generates the actual (random) name. The C2PA
+    # reader picks the format from it, so it follows the content, not the
+    # uploaded filename.
+    suffix = '.' + image_type
+
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    file.save(temp_file.name)
+    shutil.copyfileobj(file.stream, temp_file, length=COPY_BUFFER_SIZE)
     temp_file.close()
     return temp_file.name
 
 
 def download_image_from_url(url):
     """
-    Download image from URL to temp location
+    Download image from URL into memory, spilling to a temp file if it is large
 
     Args:
         url: Image URL to download
 
     Returns:
-        str: Path to temporary file
+        tuple: (image_bytes, temp_path, mime_type) - exactly one of
+        image_bytes / temp_path is set; mime_type is sniffed from the content
 
     Raises:
         ValueError: If URL doesn't point to an image
         requests.RequestException: If download fails
     """
-    # Download with timeout
-    response = requests.get(url, timeout=30, stream=True)
-    response.raise_for_status()
+    # Download with (connect, read) timeout; images are already compressed.
+    # Closing the streamed response returns its connection to the pool on
+    # every path, including rejections.
+    with http_session.get(
+        url,
+        timeout=(3.05, 27),
+        stream=True,
+        headers={'Accept-Encoding': 'identity'}
+    ) as response:
+        response.raise_for_status()
+
+        # Check content type (media type only, without parameters like "; charset=binary")
+        content_type = response.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+        if 'image' not in content_type:
+            raise ValueError(f"URL does not point to an image (content-type: {content_type})")
+
+        # Reject oversized images up front when the server declares the size
+        max_size = app.config['MAX_CONTENT_LENGTH']
+        try:
+            content_length = int(response.headers.get('content-length') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > max_size:
+            raise ValueError(f"Image too large ({content_length} bytes, max {max_size})")
+
+        # Let urllib3 undo any transfer encoding before reading raw bytes
+        response.raw.decode_content = True
+
+        # Read the first block and reject non-images before anything hits disk
+        data = _read_up_to(response.raw, IN_MEMORY_MAX_SIZE + 1)
+        image_type = sniff_image_type(data[:16])
+        if not image_type:
+            raise ValueError(f"URL content is not a JPEG, PNG or GIF image (content-type: {content_type})")
+
+        # Small images stay in memory - the size cap may be below the in-memory limit
+        if len(data) <= IN_MEMORY_MAX_SIZE:
+            if len(data) > max_size:
+                raise ValueError(f"Image too large ({len(data)} bytes, max {max_size})")
+            return data, None, IMAGE_MIME_TYPES[image_type]
+
+        # Large image - save what we have plus the rest of the stream to a temp file
+        # named after the sniffed format (URLs often lack an extension)
+        suffix = '.' + image_type
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+
+        # Enforce the size cap while streaming - Content-Length may be absent or wrong
+        try:
+            temp_file.write(data)
+            written = len(data)
+            while True:
+                chunk = response.raw.read(COPY_BUFFER_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_size:
+                    raise ValueError(f"Image too large (over {max_size} bytes)")
+                temp_file.write(chunk)
+        except Exception:
+            temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+
+        temp_file.close()
+        return None, temp_file.name, IMAGE_MIME_TYPES[image_type]
+
+
+# Temp files are deleted by a background thread so responses don't wait on unlink
+_cleanup_queue = queue.Queue()
+_cleanup_thread = None
+_cleanup_lock = threading.Lock()
+
+
+def _delete_temp_file(path):
+    """Delete a temp file, logging instead of raising on failure"""
+    try:
+        os.unlink(path)
+        app.logger.debug("Cleaned up temporary file: %s", path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        app.logger.warning(f"Failed to clean up temp file {path}: {str(e)}")
 
-    # Check content type
-    content_type = response.headers.get('content-type', '')
-    if 'image' not in content_type.lower():
-        raise ValueError(f"URL does not point to an image (content-type: {content_type})")
 
-    # Save to temp file
-    suffix = os.path.splitext(url.split('?')[0])[1] or '.jpg'
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+def _cleanup_worker():
+    """Drain the cleanup queue forever"""
+    while True:
+        path = _cleanup_queue.get()
+        _delete_temp_file(path)
+        _cleanup_queue.task_done()
 
-    for chunk in response.iter_content(chunk_size=8192):
-        temp_file.write(chunk)
 
-    temp_file.close()
-    return temp_file.name
+def schedule_cleanup(path):
+    """
+    Queue a temp file for deletion by the background cleanup thread
+
+    Args:
+        path: Path to temporary file
+    """
+    global _cleanup_thread
+
+    # Start lazily so the thread is created in the serving process (post-fork)
+    with _cleanup_lock:
+        if _cleanup_thread is None or not _cleanup_thread.is_alive():
+            _cleanup_thread = threading.Thread(target=_cleanup_worker, name='temp-cleanup', daemon=True)
+            _cleanup_thread.start()
+
+    _cleanup_queue.put(path)
+
 
+@atexit.register
+def _flush_cleanup_queue():
+    """Delete any temp files still queued at interpreter exit"""
+    while True:
+        try:
+            path = _cleanup_queue.get_nowait()
+        except queue.Empty:
+            break
+        _delete_temp_file(path)
 
-def validate_request_data(data, required_fields):
+
+def _collect_result(future, step_name, fallback):
+    """
+    Wait for a pipeline step and degrade gracefully if it raised
+
+    Args:
+        future: concurrent.futures.Future for the step
+        step_name: Human-readable step name for logging
+        fallback: dict of base fields to return on failure
+
+    Returns:
+        dict: Step result, or fallback with an 'error' field
+    """
+    try:
+        return future.result()
+    except Exception as e:
+        app.logger.error(f"{step_name} failed: {str(e)}")
+        return {**fallback, 'error': f'{step_name} failed: {str(e)}'}
+
+
+def search_image_cached(image_source, image_url):
+    """
+    Reverse image search, reusing results for perceptually similar images
+
+    Args:
+        image_source: Image bytes or ImageSource (for hashing)
+        image_url: URL of image to search
+
+    Returns:
+        dict: search_image result
+    """
+    image_hash = image_dhash(image_source)
+
+    if image_hash is not None:
+        cached = reverse_search_cache.get(image_hash)
+        if cached is not None:
+            app.logger.info("Reverse search served from perceptual hash cache")
+            return {**cached, 'cached': True}
+
+    result = search_image(image_url)
+
+    # Only cache completed searches - errors (rate limits, CAPTCHAs) should be retried
+    if image_hash is not None and 'error' not in result:
+        reverse_search_cache.set(image_hash, result)
+
+    return result
+
+
+def analyze_signals(signals):
     """
-    Validate request has required fields
+    Analysis for the collected signals
+
+    Conclusive signals are decided by rules_analysis before the LLM cache is
+    consulted, so they never cost an embeddings call and a semantic near-hit
+    can't override them.
 
     Args:
-        data: Request data dict
-        required_fields: List of required field names
+        signals: dict with c2pa, exif, reverse_search data
 
     Returns:
-        tuple: (is_valid, error_message)
+        dict: synthesize_analysis result
     """
-    for field in required_fields:
-        if field not in data:
-            return False, f"Missing required field: {field}"
-    return True, None
+    analysis = rules_analysis(signals)
+    if analysis is not None:
+        app.logger.info(f"Analysis decided without LLM: {analysis['reasoning']}")
+        return analysis
+
+    analysis, cache_hit = llm_cache.get_or_compute(
+        'analysis',
+        signals,
+        lambda: synthesize_analysis(signals, apply_rules=False),
+        context=cache_context('analysis')
+    )
+    if cache_hit:
+        app.logger.info("Analysis served from LLM cache")
+    return analysis
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Return JSON when an upload exceeds MAX_CONTENT_LENGTH"""
+    return jsonify({
+        'success': False,
+        'error': f'File too large. Maximum size is {app.config["MAX_CONTENT_LENGTH"] // (1024 * 1024)}MB'
+    }), 413
 
 
 @app.route('/')
@@ -126,8 +459,11 @@ def analyze():
         JSON with confidence score, signals, and recommendations
     """
     start_time = time.time()
+    image_bytes = None
     temp_path = None
+    image_file = None
     image_url = None
+    mime_type = None
 
     try:
         # Determine input mode: file upload or URL
@@ -148,7 +484,13 @@ def analyze():
                 }), 400
 
             app.logger.info(f"Analysis request received: file upload ({file.filename})")
-            temp_path = save_uploaded_file(file)
+            try:
+                image_bytes, temp_path, mime_type = read_uploaded_file(file)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
 
         elif request.is_json and 'image_url' in request.json:
             # Mode B: Image URL
@@ -156,7 +498,7 @@ def analyze():
             app.logger.info(f"Analysis request received: URL ({image_url})")
 
             try:
-                temp_path = download_image_from_url(image_url)
+                image_bytes, temp_path, mime_type = download_image_from_url(image_url)
             except requests.RequestException as e:
                 return jsonify({
                     'success': False,
@@ -174,27 +516,50 @@ def analyze():
                 'error': 'No file or image_url provided. Send file via multipart/form-data or image_url via JSON'
             }), 400
 
-        # Pipeline Step 1: Extract EXIF
-        app.logger.info("Step 1/4: Extracting EXIF metadata...")
-        exif_data = extract_exif(temp_path)
-        app.logger.info(f"EXIF data extracted: {exif_data}")
-
-        # Pipeline Step 2: Check C2PA
-        app.logger.info("Step 2/4: Checking C2PA credentials...")
-        c2pa_data = check_c2pa(temp_path)
-
-        # Pipeline Step 3: Reverse image search
-        app.logger.info("Step 3/4: Performing reverse image search...")
-        if image_url:
-            # We have a URL, can do reverse search
-            reverse_search_data = search_image(image_url)
+        # Analyzers read from memory when possible, otherwise from one shared
+        # mapping of the temp file
+        if image_bytes is not None:
+            image_source = image_bytes
         else:
-            # File upload - no URL available for reverse search
-            reverse_search_data = {
-                "found": False,
-                "message": "Reverse search not available for file uploads (URL required)",
-                "note": "For reverse search functionality, provide image URL instead of file upload"
-            }
+            image_file = ImageSource(temp_path)
+            image_source = image_file
+
+        # Pipeline Steps 1-3 are independent and I/O-bound, so run them concurrently
+        app.logger.info("Steps 1-3/4: Extracting EXIF, checking C2PA, reverse image search...")
+        signals_start = time.time()
+        # One pass over JPEG segments: EXIF parses only the APP1 segment, and
+        # files without APP11 (JUMBF) can't carry C2PA so the reader is skipped
+        jpeg_layout = scan_jpeg(image_source)
+        exif_input = jpeg_layout['exif'] if jpeg_layout else image_source
+        skip_c2pa = jpeg_layout is not None and not jpeg_layout['has_app11']
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            f_exif = executor.submit(extract_exif, exif_input) if exif_input else None
+            f_c2pa = executor.submit(check_c2pa, image_source, mime_type) if not skip_c2pa else None
+            # Reverse search needs a URL - not available for file uploads
+            f_reverse = executor.submit(search_image_cached, image_source, image_url) if image_url else None
+
+            if f_exif:
+                exif_data = _collect_result(f_exif, 'EXIF extraction', {'has_exif': False})
+            else:
+                exif_data = dict(NO_EXIF_RESULT)
+
+            if f_c2pa:
+                c2pa_data = _collect_result(f_c2pa, 'C2PA check', {'present': False})
+            else:
+                c2pa_data = dict(NO_MANIFEST_RESULT)
+
+            if f_reverse:
+                reverse_search_data = _collect_result(f_reverse, 'Reverse search', {'found': False})
+            else:
+                reverse_search_data = {
+                    "found": False,
+                    "message": "Reverse search not available for file uploads (URL required)",
+                    "note": "For reverse search functionality, provide image URL instead of file upload"
+                }
+
+        app.logger.info("Steps 1-3/4 done in %d ms", (time.time() - signals_start) * 1000)
+        app.logger.debug("EXIF data extracted: %s", exif_data)
 
         # Pipeline Step 4: Synthesize with LLM
         app.logger.info("Step 4/4: Synthesizing analysis with AI...")
@@ -203,15 +568,16 @@ def analyze():
             "exif": exif_data,
             "reverse_search": reverse_search_data
         }
-        analysis = synthesize_analysis(signals)
+        analysis = analyze_signals(signals)
 
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
 
         app.logger.info(f"Analysis completed in {processing_time_ms}ms, confidence: {analysis.get('confidence', 'N/A')}")
 
-        # Log signals before sending
-        app.logger.info(f"Signals being returned - EXIF: {signals['exif']}")
+        # Log signals before sending (only formatted when DEBUG is enabled)
+        if app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug("Signals being returned: %s", signals)
 
         # Return complete result
         return jsonify({
@@ -221,6 +587,10 @@ def analyze():
             'processing_time_ms': processing_time_ms
         })
 
+    except HTTPException:
+        # e.g. 413 from MAX_CONTENT_LENGTH - handled by the registered error handlers
+        raise
+
     except Exception as e:
         app.logger.error(f"Analysis error: {str(e)}")
         return jsonify({
@@ -229,13 +599,12 @@ def analyze():
         }), 500
 
     finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-                app.logger.info(f"Cleaned up temporary file: {temp_path}")
-            except Exception as e:
-                app.logger.warning(f"Failed to clean up temp file {temp_path}: {str(e)}")
+        if image_file is not None:
+            image_file.close()
+
+        # Clean up temporary file off the response path
+        if temp_path:
+            schedule_cleanup(temp_path)
 
 
 @app.route('/api/generate-outreach', methods=['POST'])
@@ -261,32 +630,17 @@ def generate_outreach():
 
         data = request.json
 
-        # Validate required top-level fields
-        valid, error = validate_request_data(data, ['owner_info', 'license_params'])
-        if not valid:
+        # Validate owner_info / license_params structure in one pass
+        try:
+            validate_outreach_request(data)
+        except fastjsonschema.JsonSchemaException as e:
             return jsonify({
                 'success': False,
-                'error': error
+                'error': f'Invalid request: {e.message}'
             }), 400
 
-        # Validate owner_info fields
         owner_info = data['owner_info']
-        valid, error = validate_request_data(owner_info, ['username', 'platform'])
-        if not valid:
-            return jsonify({
-                'success': False,
-                'error': f'Invalid owner_info: {error}'
-            }), 400
-
-        # Validate license_params fields
         license_params = data['license_params']
-        required_params = ['use_case', 'scope', 'territory', 'compensation']
-        valid, error = validate_request_data(license_params, required_params)
-        if not valid:
-            return jsonify({
-                'success': False,
-                'error': f'Invalid license_params: {error}'
-            }), 400
 
         # Extract user info (optional fields with defaults)
         your_name = data.get('your_name', 'Metro News Desk Reporter')
@@ -295,7 +649,21 @@ def generate_outreach():
         app.logger.info(f"Outreach generation request: {owner_info['username']} on {owner_info['platform']}")
 
         # Generate outreach message
-        outreach = generate_outreach_message(owner_info, license_params, your_name, your_organization)
+        # Outreach inputs are fully deterministic, so exact hashing is enough
+        outreach, cache_hit = llm_cache.get_or_compute(
+            'outreach',
+            {
+                'owner_info': owner_info,
+                'license_params': license_params,
+                'your_name': your_name,
+                'your_organization': your_organization
+            },
+            lambda: generate_outreach_message(owner_info, license_params, your_name, your_organization),
+            semantic=False,
+            context=cache_context('outreach')
+        )
+        if cache_hit:
+            app.logger.info("Outreach served from LLM cache")
 
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
@@ -316,19 +684,35 @@ def generate_outreach():
         }), 500
 
 
+# /health never changes while the process runs, so serialize it once
+HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'version': '1.0.0',
+    'modules': {
+        'exif_analyzer': 'loaded',
+        'reverse_search': 'loaded',
+        'c2pa_checker': 'loaded',
+        'llm_synthesizer': 'loaded',
+        'llm_cache': 'loaded'
+    }
+})
+HEALTH_ETAG = hashlib.md5(HEALTH_BODY).hexdigest()
+
+
 @app.route('/health')
 def health():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'version': '1.0.0',
-        'modules': {
-            'exif_analyzer': 'loaded',
-            'reverse_search': 'loaded',
-            'c2pa_checker': 'loaded',
-            'llm_synthesizer': 'loaded'
+    """Health check endpoint (supports If-None-Match for cheap probes)"""
+    if request.if_none_match.contains(HEALTH_ETAG):
+        return Response(status=304, headers={'ETag': f'"{HEALTH_ETAG}"'})
+
+    return Response(
+        HEALTH_BODY,
+        mimetype='application/json',
+        headers={
+            'ETag': f'"{HEALTH_ETAG}"',
+            'Cache-Control': 'public, max-age=1'
         }
-    })
+    )
 
 
 if __name__ == '__main__':
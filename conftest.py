@@ -0,0 +1,44 @@
+"""
+Pytest configuration for the SourceTrace test suites
+
+The test modules still run standalone (python test_*.py). Under pytest,
+tests that need an OpenAI key or local sample images are reported as
+skipped instead of silently passing.
+
+Run in parallel with pytest-xdist (see requirements-dev.txt):
+    python -m pytest -n auto --dist=loadfile
+"""
+
+import os
+import pytest
+
+from utils import load_env
+
+# Load .env once for the whole session, before any test module imports
+load_env()
+
+from utils.llm_synthesizer import _check_api_key
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "requires_api_key: test makes real OpenAI calls"
+    )
+    config.addinivalue_line(
+        "markers", "requires_files(*paths): test reads local sample images"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests whose API key or sample images are unavailable"""
+    api_ok, api_message = _check_api_key()
+
+    for item in items:
+        if not api_ok and item.get_closest_marker('requires_api_key'):
+            item.add_marker(pytest.mark.skip(reason=api_message))
+
+        files_marker = item.get_closest_marker('requires_files')
+        if files_marker:
+            missing = [path for path in files_marker.args if not os.path.exists(path)]
+            if len(missing) == len(files_marker.args):
+                item.add_marker(pytest.mark.skip(reason=f"Test image not found: {missing[0]}"))
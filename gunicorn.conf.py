@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for SourceTrace
+
+Uses threaded workers so a slow upstream call (image download, reverse
+search, OpenAI) only occupies one thread instead of a whole worker process.
+All of that work is I/O-bound, so threads release the GIL while waiting.
+
+Run with: gunicorn app:app
+"""
+
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+
+# Processes x threads = concurrent in-flight requests
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+
+# Analysis can take up to ~60s when reverse search and the LLM are both slow
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 90))
+graceful_timeout = 30
+keepalive = 5
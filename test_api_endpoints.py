@@ -11,19 +11,29 @@ import json
 import io
 import tempfile
 from PIL import Image
-from dotenv import load_dotenv
+from utils import load_env
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (no-op if conftest already did)
+load_env()
 
 # Import Flask app
-from app import app
+import app as app_module
+from app import app, read_uploaded_file, download_image_from_url, analyze_signals
+from utils.llm_cache import LLMCache
+from utils.llm_synthesizer import cache_context
+from werkzeug.datastructures import FileStorage
 
 # Test configuration
 # Using httpbin.org which allows testing HTTP requests
 TEST_IMAGE_URL = "https://httpbin.org/image/jpeg"
 
 
+# Console formatting, built once
+_SEP = "=" * 70
+_HEADER_TMPL = f"\n{_SEP}\nTEST: {{}}\n{_SEP}"
+_BANNER_TMPL = f"\n{_SEP}\n{{}}\n{_SEP}"
+
+
 def create_test_image():
     """
     Create a simple test image with EXIF data
@@ -62,9 +72,7 @@ def create_test_image_file():
 
 def print_test_header(test_name):
     """Print formatted test header"""
-    print("\n" + "=" * 70)
-    print(f"TEST: {test_name}")
-    print("=" * 70)
+    print(_HEADER_TMPL.format(test_name))
 
 
 def print_response(response, show_full=False):
@@ -239,6 +247,135 @@ def test_analyze_invalid_file_type():
         return True
 
 
+def test_analyze_disguised_file():
+    """Test POST /api/analyze with non-image content behind an image extension"""
+    print_test_header("POST /api/analyze - Non-Image Content With .jpg Extension")
+
+    with app.test_client() as client:
+        # Text content renamed to .jpg passes the extension check
+        fake_image = io.BytesIO(b"This is not an image")
+
+        # Send request
+        response = client.post(
+            '/api/analyze',
+            data={'file': (fake_image, 'test.jpg')},
+            content_type='multipart/form-data'
+        )
+
+        print_response(response)
+
+        # Assertions
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+
+        data = response.get_json()
+        assert data['success'] is False, "Expected success=False"
+        assert 'not a jpeg, png or gif' in data['error'].lower(), "Error should mention content check"
+
+        print("\n✅ Test passed: Disguised file rejected by content check")
+        return True
+
+
+def test_upload_mime_from_content():
+    """Test the MIME type passed to the analyzers comes from the file content"""
+    print_test_header("Upload MIME Type - Sniffed From Content")
+
+    # JPEG bytes uploaded under a .png name
+    upload = FileStorage(stream=create_test_image(), filename='photo.png')
+    image_bytes, temp_path, mime_type = read_uploaded_file(upload)
+    print(f"  Filename: photo.png, MIME type: {mime_type}")
+
+    assert image_bytes is not None and temp_path is None, "Small upload should stay in memory"
+    assert mime_type == 'image/jpeg', f"Expected image/jpeg from content, got {mime_type}"
+
+    print("\n✅ Test passed: MIME type follows the bytes, not the filename")
+    return True
+
+
+class _FakeDownload:
+    """Streamed response stand-in for download_image_from_url"""
+
+    def __init__(self, data):
+        self.headers = {'content-type': 'image/jpeg'}
+        self.raw = io.BytesIO(data)
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+
+def test_download_size_cap():
+    """Test small downloads honour MAX_CONTENT_LENGTH and release the connection"""
+    print_test_header("Image Download - Size Cap Below In-Memory Limit")
+
+    data = create_test_image().getvalue()
+    response = _FakeDownload(data)
+    original_get = app_module.http_session.get
+    original_max = app.config['MAX_CONTENT_LENGTH']
+    app_module.http_session.get = lambda *args, **kwargs: response
+    app.config['MAX_CONTENT_LENGTH'] = len(data) - 1
+    try:
+        download_image_from_url('https://example.com/image.jpg')
+        raise AssertionError("Download over MAX_CONTENT_LENGTH should be rejected")
+    except ValueError as e:
+        print(f"  Rejected: {e}")
+        assert 'too large' in str(e).lower()
+    finally:
+        app_module.http_session.get = original_get
+        app.config['MAX_CONTENT_LENGTH'] = original_max
+
+    assert response.closed, "Rejected download should close its response"
+
+    print("\n✅ Test passed: Size cap enforced and response closed")
+    return True
+
+
+def test_rules_before_semantic_cache():
+    """Test conclusive signals are decided by rules even when the cache has a near-hit"""
+    print_test_header("Analysis - Rules Before Semantic Cache")
+
+    embedded = []
+
+    class FixedEmbeddingCache(LLMCache):
+        def _embed(self, text):
+            embedded.append(text)
+            return [1.0, 0.0, 0.0]  # Every signal set is a near-hit
+
+    cache = FixedEmbeddingCache(semantic=True)
+    undecided = {
+        "c2pa": {"present": False},
+        "exif": {"has_exif": True, "camera_make": "Canon"},
+        "reverse_search": {"found": False, "match_count": 0}
+    }
+    cached = {"confidence": 50, "summary": "cached", "recommendation": "manual_review"}
+    cache.get_or_compute('analysis', undecided, lambda: dict(cached), context=cache_context('analysis'))
+    embedded.clear()
+
+    signed = {
+        "c2pa": {"present": True, "valid": True, "signature_info": {"issuer": "Test CA"}},
+        "exif": {"has_exif": False},
+        "reverse_search": {"found": False, "match_count": 0}
+    }
+    original_cache = app_module.llm_cache
+    app_module.llm_cache = cache
+    try:
+        analysis = analyze_signals(signed)
+    finally:
+        app_module.llm_cache = original_cache
+    print(f"  Confidence: {analysis['confidence']}, reasoning: {analysis['reasoning']}")
+
+    assert analysis['confidence'] == 95, "Semantic near-hit overrode the rule verdict"
+    assert not embedded, "Rule-decided signals should not be embedded"
+
+    print("\n✅ Test passed: Rule verdict wins without touching the cache")
+    return True
+
+
 def test_analyze_invalid_url():
     """Test POST /api/analyze with invalid URL"""
     print_test_header("POST /api/analyze - Invalid URL")
@@ -365,6 +502,12 @@ def test_health_endpoint():
         assert modules['c2pa_checker'] == 'loaded', "c2pa_checker not loaded"
         assert modules['llm_synthesizer'] == 'loaded', "llm_synthesizer not loaded"
 
+        # Conditional request with the returned ETag should be a 304
+        etag = response.headers.get('ETag')
+        assert etag, "Missing ETag header"
+        cached_response = client.get('/health', headers={'If-None-Match': etag})
+        assert cached_response.status_code == 304, f"Expected 304, got {cached_response.status_code}"
+
         print("\n✅ Test passed: Health endpoint works correctly")
         return True
 
@@ -415,9 +558,7 @@ def test_processing_time_limits():
 
 def run_all_tests():
     """Run all test cases"""
-    print("\n" + "=" * 70)
-    print("SOURCETRACE API TEST SUITE")
-    print("=" * 70)
+    print(_BANNER_TMPL.format("SOURCETRACE API TEST SUITE"))
 
     # Check API key
     if not os.getenv('OPENAI_API_KEY'):
@@ -432,6 +573,10 @@ def run_all_tests():
         test_analyze_url,
         test_analyze_no_input,
         test_analyze_invalid_file_type,
+        test_analyze_disguised_file,
+        test_upload_mime_from_content,
+        test_download_size_cap,
+        test_rules_before_semantic_cache,
         test_analyze_invalid_url,
         test_generate_outreach,
         test_generate_outreach_missing_fields,
@@ -456,9 +601,7 @@ def run_all_tests():
             print(f"\n❌ Test error: {e}")
 
     # Summary
-    print("\n" + "=" * 70)
-    print("TEST SUMMARY")
-    print("=" * 70)
+    print(_BANNER_TMPL.format("TEST SUMMARY"))
     print(f"\nTotal tests: {len(tests)}")
     print(f"✅ Passed: {passed}")
     print(f"❌ Failed: {failed}")
@@ -468,7 +611,7 @@ def run_all_tests():
         for test_name, error in errors:
             print(f"  - {test_name}: {error}")
 
-    print("\n" + "=" * 70)
+    print("\n" + _SEP)
 
     return passed == len(tests)
 
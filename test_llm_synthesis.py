@@ -7,48 +7,115 @@ Run with: python test_llm_synthesis.py
 
 import os
 import sys
-from dotenv import load_dotenv
+import asyncio
+import json
+import tempfile
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils import load_env
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (no-op if conftest already did)
+load_env()
 
 from utils.llm_synthesizer import (
     synthesize_analysis,
     generate_outreach,
+    synthesize_and_outreach,
+    synthesize_analysis_async,
+    synthesize_analysis_batch,
+    generate_outreach_deferred,
+    poll_outreach,
+    generate_outreach_async,
     _check_api_key,
+    _scan_partial_analysis,
+    _signals_json,
+    _analysis_request,
+    _outreach_request,
+    rules_analysis,
+    cache_context,
     _validate_analysis_response,
-    _validate_outreach_response
+    _validate_fallback_analysis,
+    _validate_fallback_outreach
 )
+from utils.llm_cache import DiskBackend, LLMCache
+from utils.dynamic_batcher import dynamically
+
+# Local sample image for the pipeline test - skipped under pytest when absent
+PIPELINE_IMAGE = "/Users/zgulick/Downloads/textscreen.png"
+
+
+# Console formatting, built once
+_SEP = "=" * 70
+_HEADER_TMPL = f"\n{_SEP}\nTEST: {{}}\n{_SEP}"
+_BANNER_TMPL = f"\n{_SEP}\n{{}}\n{_SEP}"
+
+
+def _open_if_exists(path):
+    """Open an image for reading, or return None if it isn't there"""
+    try:
+        return open(path, 'rb')
+    except OSError:
+        return None
 
 
 def print_test_header(test_name):
     """Print formatted test header"""
-    print(f"\n{'='*70}")
-    print(f"TEST: {test_name}")
-    print(f"{'='*70}")
+    print(_HEADER_TMPL.format(test_name))
 
 
 def print_result(result, indent=0):
-    """Pretty print result dictionary"""
-    prefix = "  " * indent
-    for key, value in result.items():
+    """Pretty print result dictionary
+
+    Walks nested dicts/lists with an explicit stack and emits all lines in
+    a single write instead of one print() per field.
+    """
+    lines = []
+    # Stack of (indent, iterator, is_list); list iterators belong to the
+    # key printed at that indent
+    stack = [(indent, iter(result.items()), False)]
+    while stack:
+        level, items, is_list = stack[-1]
+        entry = next(items, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        prefix = "  " * level
+        if is_list:
+            i, item = entry
+            if isinstance(item, dict):
+                lines.append(f"{prefix}  [{i}]:")
+                stack.append((level + 2, iter(item.items()), False))
+            else:
+                lines.append(f"{prefix}  [{i}]: {item}")
+            continue
+
+        key, value = entry
         if isinstance(value, dict):
-            print(f"{prefix}{key}:")
-            print_result(value, indent + 1)
+            lines.append(f"{prefix}{key}:")
+            stack.append((level + 1, iter(value.items()), False))
         elif isinstance(value, list):
-            print(f"{prefix}{key}: [{len(value)} items]")
-            for i, item in enumerate(value[:5]):  # Show first 5 items
-                if isinstance(item, dict):
-                    print(f"{prefix}  [{i}]:")
-                    print_result(item, indent + 2)
-                else:
-                    print(f"{prefix}  [{i}]: {item}")
-        else:
+            lines.append(f"{prefix}{key}: [{len(value)} items]")
+            stack.append((level, enumerate(value[:5]), True))  # Show first 5 items
+        elif isinstance(value, str) and len(value) > 100:
             # Truncate long strings
-            if isinstance(value, str) and len(value) > 100:
-                print(f"{prefix}{key}: {value[:100]}...")
-            else:
-                print(f"{prefix}{key}: {value}")
+            lines.append(f"{prefix}{key}: {value[:100]}...")
+        else:
+            lines.append(f"{prefix}{key}: {value}")
+
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Quiet mode for CI: one line per test, no result dumps
+if os.environ.get("SOURCETRACE_QUIET"):
+    def print_test_header(test_name):
+        """Print one-line test header"""
+        print(f"[TEST] {test_name}")
+
+    def print_result(result, indent=0):
+        """Result dumps are skipped in quiet mode"""
 
 
 def test_api_key_check():
@@ -89,15 +156,17 @@ def test_validate_analysis_response():
 
     valid, message = _validate_analysis_response(valid_response)
     print(f"Valid response test: {valid} - {message}")
+    assert valid, message
 
-    # Missing field
+    # Missing confidence (strict mode fixes the rest of the shape)
     invalid_response = {
-        "confidence": 85
-        # Missing summary and recommendation
+        "summary": "Test",
+        "recommendation": "manual_review"
     }
 
     valid, message = _validate_analysis_response(invalid_response)
     print(f"Invalid response test: {valid} - {message}")
+    assert not valid, "Missing confidence should fail"
 
     # Invalid confidence
     invalid_confidence = {
@@ -108,11 +177,82 @@ def test_validate_analysis_response():
 
     valid, message = _validate_analysis_response(invalid_confidence)
     print(f"Invalid confidence test: {valid} - {message}")
+    assert not valid, "Out-of-range confidence should fail"
 
     print("\n✅ PASS: Validation logic works correctly")
     return True
 
 
+def test_signals_json():
+    """Test signal blocks are sent compactly without empty fields"""
+    print_test_header("Signals JSON - Compact Prompt Blocks")
+
+    exif = {
+        "has_exif": True,
+        "camera_make": "Apple",
+        "flash": False,
+        "iso": 0,
+        "software": "",
+        "gps_latitude": None,
+        "extra": {"note": None, "tags": []}
+    }
+
+    text = _signals_json(exif)
+    print(text)
+
+    assert json.loads(text) == {"has_exif": True, "camera_make": "Apple", "flash": False, "iso": 0}, \
+        f"Unexpected fields: {text}"
+    assert ' ' not in text and '\n' not in text, "Signals JSON should be compact"
+
+    print("\n✅ PASS: Empty fields pruned, falsy values kept")
+    return True
+
+
+def test_per_task_models():
+    """Test analysis and outreach requests use their own model settings"""
+    print_test_header("Per-Task Models")
+
+    overrides = {'OPENAI_ANALYSIS_MODEL': 'analysis-model', 'OPENAI_OUTREACH_MODEL': 'outreach-model'}
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        analysis = _analysis_request({"c2pa": {}, "exif": {}, "reverse_search": {}})
+        outreach = _outreach_request({}, {}, 'Reporter', 'Desk')
+        print(f"Analysis model: {analysis['model']}, outreach model: {outreach['model']}")
+
+        assert analysis['model'] == 'analysis-model', "Analysis should use OPENAI_ANALYSIS_MODEL"
+        assert outreach['model'] == 'outreach-model', "Outreach should use OPENAI_OUTREACH_MODEL"
+        assert cache_context('analysis')['model'] == 'analysis-model'
+        assert cache_context('outreach')['model'] == 'outreach-model'
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    print("\n✅ PASS: Each task routed to its own model")
+    return True
+
+
+def test_partial_analysis_scan():
+    """Test early fields are picked out of a streaming analysis"""
+    print_test_header("Partial Analysis Scan")
+
+    stream = '{"confidence": 82, "summary": "Looks original", "red_flags": [], "recommendation": "proceed_to_rights", "probable_owner": {"confidence": 40'
+    partial = {}
+
+    # Nothing complete yet - the number may still be growing
+    assert not _scan_partial_analysis(stream[:16], partial), "Incomplete number reported"
+
+    # The nested probable_owner confidence must not replace the score
+    assert _scan_partial_analysis(stream, partial), "Completed fields not reported"
+    assert partial == {"confidence": 82, "recommendation": "proceed_to_rights"}, f"Unexpected fields: {partial}"
+
+    print("\n✅ PASS: Partial fields decoded from the stream")
+    return True
+
+
 def test_synthesize_analysis_without_api_key():
     """Test synthesize_analysis with mock data (no API key required)"""
     print_test_header("Synthesize Analysis - Fallback (No API Key)")
@@ -136,44 +276,67 @@ def test_synthesize_analysis_without_api_key():
         }
     }
 
-    # Save original API key
-    original_key = os.environ.get('OPENAI_API_KEY')
+    # Empty key override forces the fallback path
+    result = synthesize_analysis(signals, api_key="")
+    print_result(result)
 
-    # Temporarily remove API key to test fallback
-    if 'OPENAI_API_KEY' in os.environ:
-        del os.environ['OPENAI_API_KEY']
+    # Verify fallback structure (required fields, manual_review, error message)
+    valid, message = _validate_fallback_analysis(result)
+    assert valid, f"Invalid fallback analysis: {message}"
 
-    try:
-        result = synthesize_analysis(signals)
-        print_result(result)
+    print("\n✅ PASS: Fallback response has correct structure")
+    return True
 
-        # Verify fallback structure
-        assert 'confidence' in result, "Missing confidence"
-        assert 'summary' in result, "Missing summary"
-        assert 'recommendation' in result, "Missing recommendation"
-        assert result['recommendation'] == 'manual_review', "Should recommend manual_review when API unavailable"
-        assert 'error' in result, "Should include error message"
 
-        print("\n✅ PASS: Fallback response has correct structure")
-        return True
+def test_rules_fast_path():
+    """Test conclusive signals are decided without an LLM call"""
+    print_test_header("Rules Fast Path")
 
-    finally:
-        # Restore API key
-        if original_key:
-            os.environ['OPENAI_API_KEY'] = original_key
+    c2pa_only = {
+        "c2pa": {"present": True, "valid": True, "signature_info": {"issuer": "Test CA"}},
+        "exif": {"has_exif": False},
+        "reverse_search": {"found": False, "match_count": 0}
+    }
+    repost = {
+        "c2pa": {"present": False},
+        "exif": {"has_exif": False},
+        "reverse_search": {"found": True, "match_count": 5}
+    }
+    ambiguous = {
+        "c2pa": {"present": False},
+        "exif": {"has_exif": True, "camera_make": "Apple"},
+        "reverse_search": {"found": True, "match_count": 5}
+    }
+
+    # api_key="" would force a fallback with 'error' if the LLM path ran
+    result = synthesize_analysis(c2pa_only, api_key="")
+    print(f"C2PA only: {result['confidence']} / {result['recommendation']}")
+    assert result['confidence'] >= 90 and result['recommendation'] == 'proceed_to_rights'
+    assert 'error' not in result, "Rule-decided analysis should not call the LLM"
+    valid, message = _validate_analysis_response(result)
+    assert valid, f"Rule-decided analysis failed validation: {message}"
+
+    result = synthesize_analysis(repost, api_key="")
+    print(f"Repost: {result['confidence']} / {result['recommendation']}")
+    assert result['confidence'] < 30 and result['recommendation'] == 'high_risk'
+    assert 'error' not in result
+
+    assert rules_analysis(ambiguous) is None, "Ambiguous signals should go to the LLM"
+
+    # Batches only send the undecided items to the model
+    results = synthesize_analysis_batch([c2pa_only, ambiguous, repost], api_key="")
+    assert [r['recommendation'] for r in results] == ['proceed_to_rights', 'manual_review', 'high_risk']
+    assert 'error' in results[1], "Ambiguous item should get the no-key fallback"
+
+    print("\n✅ PASS: Conclusive cases decided by rules, ambiguous ones left to the LLM")
+    return True
 
 
+@pytest.mark.requires_api_key
 def test_synthesize_analysis_with_api_key():
     """Test synthesize_analysis with real API call (if key available)"""
     print_test_header("Synthesize Analysis - Real API Call")
 
-    # Check if API key is configured
-    key_valid, key_message = _check_api_key()
-    if not key_valid:
-        print(f"⏭️  SKIP: {key_message}")
-        print("   Configure OPENAI_API_KEY to test real API calls")
-        return True
-
     # Mock signals - good quality data
     signals = {
         "c2pa": {
@@ -203,9 +366,8 @@ def test_synthesize_analysis_with_api_key():
 
     # Verify structure
     if 'error' in result:
-        print(f"\n⚠️  API call failed: {result['error']}")
-        print("   This is OK - fallback response is valid")
-        return True
+        # Fallback response is valid, but the real call wasn't tested
+        pytest.skip(f"API call failed: {result['error']}")
 
     assert 'confidence' in result, "Missing confidence"
     assert isinstance(result['confidence'], int), "Confidence should be int"
@@ -236,44 +398,205 @@ def test_generate_outreach_without_api_key():
         "compensation": "standard_rate"
     }
 
-    # Save original API key
-    original_key = os.environ.get('OPENAI_API_KEY')
+    # Empty key override forces the fallback path
+    result = generate_outreach(owner_info, license_params, api_key="")
+    print_result(result)
 
-    # Temporarily remove API key
-    if 'OPENAI_API_KEY' in os.environ:
-        del os.environ['OPENAI_API_KEY']
+    # Verify fallback structure (required fields, next_steps list, error message)
+    valid, message = _validate_fallback_outreach(result)
+    assert valid, f"Invalid fallback outreach: {message}"
 
-    try:
-        result = generate_outreach(owner_info, license_params)
-        print_result(result)
+    print("\n✅ PASS: Fallback outreach has correct structure")
+    return True
 
-        # Verify fallback structure
-        assert 'outreach_message' in result, "Missing outreach_message"
-        assert 'license_summary' in result, "Missing license_summary"
-        assert 'next_steps' in result, "Missing next_steps"
-        assert isinstance(result['next_steps'], list), "next_steps should be list"
-        assert 'error' in result, "Should include error message"
 
-        print("\n✅ PASS: Fallback outreach has correct structure")
-        return True
+def test_async_variants_without_api_key():
+    """Test the async variants fall back like the sync functions"""
+    print_test_header("Async Variants - Fallback (No API Key)")
 
-    finally:
-        # Restore API key
-        if original_key:
-            os.environ['OPENAI_API_KEY'] = original_key
+    signals = {
+        "c2pa": {"present": False},
+        "exif": {"has_exif": False},
+        "reverse_search": {"found": False, "match_count": 0}
+    }
+    owner_info = {"username": "@testuser", "platform": "Twitter/X"}
+    license_params = {"use_case": "breaking_news", "compensation": "standard_rate"}
+
+    async def run_both():
+        return await asyncio.gather(
+            synthesize_analysis_async(signals, api_key=""),
+            generate_outreach_async(owner_info, license_params, api_key="")
+        )
+
+    analysis, outreach = asyncio.run(run_both())
 
+    assert analysis == synthesize_analysis(signals, api_key=""), "Async analysis differs from sync fallback"
+    assert outreach == generate_outreach(owner_info, license_params, api_key=""), "Async outreach differs from sync fallback"
+
+    print("\n✅ PASS: Async fallbacks match the sync functions")
+    return True
+
+
+def test_synthesize_analysis_batch_without_api_key():
+    """Test the batch call returns one fallback per signal set"""
+    print_test_header("Synthesize Analysis Batch - Fallback (No API Key)")
+
+    signals_list = [
+        {"c2pa": {"present": False}, "exif": {"has_exif": False}},
+        {"c2pa": {"present": False}, "exif": {"has_exif": True, "camera_make": "Apple"}},
+        {"c2pa": {"present": False}, "reverse_search": {"found": False}}
+    ]
 
+    results = synthesize_analysis_batch(signals_list, api_key="")
+    assert len(results) == len(signals_list), f"Expected {len(signals_list)} results, got {len(results)}"
+
+    for result in results:
+        valid, message = _validate_fallback_analysis(result)
+        assert valid, f"Invalid fallback analysis: {message}"
+
+    assert synthesize_analysis_batch([], api_key="") == [], "Empty batch should return no results"
+
+    print("\n✅ PASS: Batch fallbacks have correct structure")
+    return True
+
+
+def test_deferred_outreach_without_api_key():
+    """Test the Batch API outreach path falls back without a key"""
+    print_test_header("Deferred Outreach - Fallback (No API Key)")
+
+    owner_info = {"username": "@testuser", "platform": "Instagram"}
+    license_params = {"use_case": "news_article", "compensation": "$150 flat fee"}
+
+    result = generate_outreach_deferred(owner_info, license_params, api_key="")
+    assert isinstance(result, dict), "Without a key no batch should be submitted"
+    valid, message = _validate_fallback_outreach(result)
+    assert valid, f"Invalid fallback outreach: {message}"
+
+    result = poll_outreach("batch_missing", owner_info, license_params, api_key="")
+    valid, message = _validate_fallback_outreach(result)
+    assert valid, f"Invalid fallback outreach: {message}"
+
+    print("\n✅ PASS: Deferred outreach fallbacks have correct structure")
+    return True
+
+
+def test_dynamic_batcher():
+    """Test concurrent calls are coalesced into size-bounded batches"""
+    print_test_header("Dynamic Batcher")
+
+    batches = []
+
+    @dynamically(max_batch_size=4, timeout_ms=20)
+    async def double(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        return await asyncio.gather(*(double(i) for i in range(10)))
+
+    results = asyncio.run(run())
+    print(f"Batches: {batches}")
+
+    assert results == [i * 2 for i in range(10)], "Results out of order"
+    assert [len(b) for b in batches] == [4, 4, 2], f"Unexpected batch sizes: {batches}"
+
+    print("\n✅ PASS: Calls batched and results returned in order")
+    return True
+
+
+def test_llm_disk_cache():
+    """Test disk-backed response caching and model-settings scoping"""
+    print_test_header("LLM Cache - Disk Backend")
+
+    signals = {"c2pa": {"present": False}, "exif": {"has_exif": False}}
+    response = {"confidence": 40, "summary": "cached", "recommendation": "manual_review"}
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return dict(response)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        context = cache_context('analysis')
+
+        cache = LLMCache(backend=DiskBackend(cache_dir))
+        result, hit = cache.get_or_compute('analysis', signals, compute, context=context)
+        assert not hit and result == response, "First lookup should compute"
+
+        # A new cache over the same directory sees the stored response
+        cache = LLMCache(backend=DiskBackend(cache_dir))
+        result, hit = cache.get_or_compute('analysis', signals, compute, context=context)
+        assert hit and result == response, "Second lookup should hit the disk cache"
+
+        # Different model settings must not reuse the response
+        other_context = dict(context, temperature=0.9)
+        _, hit = cache.get_or_compute('analysis', signals, compute, context=other_context)
+        assert not hit, "Changed model settings should miss"
+
+    assert len(calls) == 2, f"Expected 2 computations, got {len(calls)}"
+
+    print("\n✅ PASS: Disk cache round-trips and is scoped to model settings")
+    return True
+
+
+def test_llm_cache_backend_failure():
+    """Test a failing cache backend degrades to computing the response"""
+    print_test_header("LLM Cache - Backend Failure")
+
+    class FailingBackend:
+        def get(self, key):
+            raise ConnectionError("cache server unreachable")
+
+        def set(self, key, value):
+            raise ConnectionError("cache server unreachable")
+
+        def clear(self):
+            pass
+
+    cache = LLMCache(backend=FailingBackend())
+    response = {"confidence": 40, "summary": "fresh", "recommendation": "manual_review"}
+
+    for _ in range(2):
+        result, hit = cache.get_or_compute('analysis', {"id": 1}, lambda: dict(response))
+        assert not hit and result == response, "Backend errors should fall through to compute"
+
+    print("\n✅ PASS: Backend errors treated as cache misses")
+    return True
+
+
+def test_llm_semantic_cache():
+    """Test semantic lookups reuse only near-identical signals"""
+    print_test_header("LLM Cache - Semantic Threshold")
+
+    # Fixed embeddings stand in for the embeddings API
+    vectors = {
+        'original': [1.0, 0.0, 0.0],
+        'near': [0.999, 0.02, 0.0],    # cosine ~0.9998
+        'different': [0.9, 0.43, 0.0]  # cosine ~0.90
+    }
+
+    class FixedEmbeddingCache(LLMCache):
+        def _embed(self, text):
+            return vectors[json.loads(text)['id']]
+
+    cache = FixedEmbeddingCache(semantic=True)
+    response = {"confidence": 70, "summary": "cached", "recommendation": "manual_review"}
+
+    cache.get_or_compute('analysis', {'id': 'original'}, lambda: dict(response))
+    _, hit = cache.get_or_compute('analysis', {'id': 'near'}, lambda: {})
+    assert hit, "Near-identical signals should hit"
+    _, hit = cache.get_or_compute('analysis', {'id': 'different'}, lambda: {})
+    assert not hit, "Signals below the threshold should miss"
+
+    print("\n✅ PASS: Semantic cache honours the similarity threshold")
+    return True
+
+
+@pytest.mark.requires_api_key
 def test_generate_outreach_with_api_key():
     """Test generate_outreach with real API call (if key available)"""
     print_test_header("Generate Outreach - Real API Call")
 
-    # Check if API key is configured
-    key_valid, key_message = _check_api_key()
-    if not key_valid:
-        print(f"⏭️  SKIP: {key_message}")
-        print("   Configure OPENAI_API_KEY to test real API calls")
-        return True
-
     owner_info = {
         "username": "@testphotographer",
         "platform": "Instagram"
@@ -292,9 +615,8 @@ def test_generate_outreach_with_api_key():
 
     # Verify structure
     if 'error' in result:
-        print(f"\n⚠️  API call failed: {result['error']}")
-        print("   This is OK - fallback response is valid")
-        return True
+        # Fallback response is valid, but the real call wasn't tested
+        pytest.skip(f"API call failed: {result['error']}")
 
     assert 'outreach_message' in result, "Missing outreach_message"
     assert 'license_summary' in result, "Missing license_summary"
@@ -308,6 +630,7 @@ def test_generate_outreach_with_api_key():
     return True
 
 
+@pytest.mark.requires_files(PIPELINE_IMAGE)
 def test_full_pipeline():
     """Test full pipeline: extract signals -> synthesize -> generate outreach"""
     print_test_header("Full Pipeline Integration Test")
@@ -317,18 +640,18 @@ def test_full_pipeline():
     from utils.c2pa_checker import check_c2pa
 
     # Use a test image
-    test_image = "/Users/zgulick/Downloads/textscreen.png"
+    test_image = PIPELINE_IMAGE
 
-    if not os.path.exists(test_image):
-        print(f"⏭️  SKIP: Test image not found: {test_image}")
-        return True
+    image_file = _open_if_exists(test_image)
+    if image_file is None:
+        pytest.skip(f"Test image not found: {test_image}")
 
-    print("Step 1: Extract EXIF...")
-    exif_data = extract_exif(test_image)
+    print("Steps 1-2: Extract EXIF and check C2PA (concurrently)...")
+    with image_file, ThreadPoolExecutor(max_workers=2) as executor:
+        f_exif = executor.submit(extract_exif, image_file)
+        f_c2pa = executor.submit(check_c2pa, test_image)
+        exif_data, c2pa_data = f_exif.result(), f_c2pa.result()
     print(f"  EXIF extracted: has_exif={exif_data.get('has_exif', False)}")
-
-    print("\nStep 2: Check C2PA...")
-    c2pa_data = check_c2pa(test_image)
     print(f"  C2PA checked: present={c2pa_data.get('present', False)}")
 
     print("\nStep 3: Mock reverse search...")
@@ -338,22 +661,13 @@ def test_full_pipeline():
         "message": "No matches found (test mode)"
     }
 
-    print("\nStep 4: Synthesize analysis...")
+    print("\nSteps 4-5: Synthesize analysis + generate outreach (single call)...")
     signals = {
         "c2pa": c2pa_data,
         "exif": exif_data,
         "reverse_search": reverse_search_data
     }
 
-    analysis = synthesize_analysis(signals)
-    print(f"  Confidence: {analysis.get('confidence', 'N/A')}")
-    print(f"  Recommendation: {analysis.get('recommendation', 'N/A')}")
-
-    print("\nStep 5: Generate outreach (if owner identified)...")
-    owner_info = analysis.get('probable_owner', {})
-    if not owner_info or owner_info.get('username') == 'Unknown':
-        owner_info = {"username": "@mockuser", "platform": "Twitter/X"}
-
     license_params = {
         "use_case": "news_story",
         "scope": "single_use",
@@ -361,7 +675,11 @@ def test_full_pipeline():
         "compensation": "$100"
     }
 
-    outreach = generate_outreach(owner_info, license_params)
+    combined = synthesize_and_outreach(signals, license_params)
+    analysis = combined['analysis']
+    outreach = combined['outreach']
+    print(f"  Confidence: {analysis.get('confidence', 'N/A')}")
+    print(f"  Recommendation: {analysis.get('recommendation', 'N/A')}")
     print(f"  Outreach generated: {len(outreach.get('outreach_message', ''))} chars")
 
     print("\n✅ PASS: Full pipeline executed successfully")
@@ -374,65 +692,85 @@ def test_full_pipeline():
     return True
 
 
+def print_traceback(e):
+    """Print the innermost frames of a test error (full traceback with SOURCETRACE_VERBOSE=1)"""
+    if os.getenv('SOURCETRACE_VERBOSE') == '1':
+        traceback.print_exception(type(e), e, e.__traceback__)
+    else:
+        traceback.print_exception(type(e), e, e.__traceback__, limit=-3, chain=False)
+
+
 def main():
     """Run all tests"""
-    print("\n" + "="*70)
-    print("SourceTrace - LLM Synthesis Module Test Suite")
-    print("="*70)
+    print(_BANNER_TMPL.format("SourceTrace - LLM Synthesis Module Test Suite"))
+
+    # Check the API key once; the Real API tests are skipped without one
+    api_ok, api_message = _check_api_key()
 
     tests = [
         ("API Key Check", test_api_key_check),
         ("Response Validation", test_validate_analysis_response),
+        ("Signals JSON", test_signals_json),
+        ("Per-Task Models", test_per_task_models),
+        ("Partial Analysis Scan", test_partial_analysis_scan),
         ("Synthesize (Fallback)", test_synthesize_analysis_without_api_key),
+        ("Rules Fast Path", test_rules_fast_path),
         ("Synthesize (Real API)", test_synthesize_analysis_with_api_key),
         ("Outreach (Fallback)", test_generate_outreach_without_api_key),
         ("Outreach (Real API)", test_generate_outreach_with_api_key),
+        ("Async (Fallback)", test_async_variants_without_api_key),
+        ("Batch (Fallback)", test_synthesize_analysis_batch_without_api_key),
+        ("Deferred Outreach (Fallback)", test_deferred_outreach_without_api_key),
+        ("Dynamic Batcher", test_dynamic_batcher),
+        ("LLM Disk Cache", test_llm_disk_cache),
+        ("LLM Cache Backend Failure", test_llm_cache_backend_failure),
+        ("LLM Semantic Cache", test_llm_semantic_cache),
         ("Full Pipeline", test_full_pipeline)
     ]
 
+    if not api_ok:
+        print(f"\n⏭️  SKIP: Real API tests ({api_message})")
+        tests = [t for t in tests if 'Real API' not in t[0]]
+
     results = []
     for test_name, test_func in tests:
         try:
             passed = test_func()
             results.append((test_name, passed, None))
+        except pytest.skip.Exception as e:
+            print(f"\n⏭️  SKIP: {e.msg}")
+            results.append((test_name, True, None))
         except AssertionError as e:
             print(f"\n❌ ASSERTION FAILED: {str(e)}")
             results.append((test_name, False, str(e)))
         except Exception as e:
             print(f"\n❌ ERROR: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            print_traceback(e)
             results.append((test_name, False, str(e)))
 
-    # Print summary
-    print("\n" + "="*70)
-    print("TEST SUMMARY")
-    print("="*70)
-
-    for test_name, passed, error in results:
-        if passed:
-            status = "✅ PASS"
-        else:
-            status = f"❌ FAIL: {error[:50]}"
-        print(f"{status}: {test_name}")
-
+    # Print summary - built up and written in one go
     total = len(results)
     passed_count = sum(1 for _, p, _ in results if p)
 
-    print(f"\nTotal: {passed_count}/{total} tests passed")
+    summary = [_BANNER_TMPL.format("TEST SUMMARY")]
+    summary.extend(
+        f"✅ PASS: {test_name}" if passed else f"❌ FAIL: {(error or '')[:50]}: {test_name}"
+        for test_name, passed, error in results
+    )
+    summary.append(f"\nTotal: {passed_count}/{total} tests passed")
 
     # Note about API key
-    key_valid, _ = _check_api_key()
-    if not key_valid:
-        print("\n📝 NOTE: Some tests used fallback responses (no API key configured)")
-        print("   To test real API calls, set OPENAI_API_KEY environment variable")
+    if not api_ok:
+        summary.append("\n📝 NOTE: Some tests used fallback responses (no API key configured)")
+        summary.append("   To test real API calls, set OPENAI_API_KEY environment variable")
 
     if passed_count == total:
-        print("\n🎉 All tests passed!")
-        return 0
+        summary.append("\n🎉 All tests passed!")
     else:
-        print(f"\n⚠️  {total - passed_count} test(s) failed")
-        return 1
+        summary.append(f"\n⚠️  {total - passed_count} test(s) failed")
+
+    print("\n".join(summary))
+    return 0 if passed_count == total else 1
 
 
 if __name__ == "__main__":
@@ -3,4 +3,20 @@ SourceTrace Utils Package
 Contains modules for provenance analysis
 """
 
+import os
+from dotenv import load_dotenv
+
 __version__ = '1.0.0'
+
+
+def load_env():
+    """
+    Load .env into os.environ once per process
+
+    Call before importing the analysis modules - several read their
+    settings at import time. Repeat calls (and child processes, which
+    inherit the flag) skip locating and parsing .env again.
+    """
+    if 'SOURCETRACE_ENV_LOADED' not in os.environ:
+        load_dotenv()
+        os.environ['SOURCETRACE_ENV_LOADED'] = '1'
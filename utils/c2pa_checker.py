@@ -11,22 +11,480 @@ for tracking the origin and editing history of digital media. Major companies
 like Adobe, Microsoft, Google, and OpenAI are adopting C2PA.
 """
 
-from c2pa import Reader, C2paError
+from collections import OrderedDict
+from copy import deepcopy
 from io import BytesIO
+import hashlib
 import logging
-import json
+import mmap
+import os
+import struct
+import threading
+from types import MappingProxyType
+
+import orjson
+
+from utils.image_io import PNG_SIGNATURE
+from utils.image_source import ImageSource
+from utils.jpeg_scanner import APP11, SOI, scan_segments
+
+
+# Result when an image carries no C2PA manifest (the common case).
+# Read-only - callers return a dict() copy.
+NO_MANIFEST_RESULT = MappingProxyType({
+    'present': False,
+    'message': 'No C2PA credentials found (most UGC lacks Content Credentials)',
+    'note': 'C2PA adoption is emerging - this is normal for social media content'
+})
+
+# Result when the manifest store doesn't resolve to an active manifest
+_UNPARSEABLE_MANIFEST_RESULT = MappingProxyType({
+    'present': False,
+    'message': 'C2PA credentials found but could not be parsed',
+    'note': 'Manifest structure is not in expected format'
+})
+
+# Shared fields of the error results; callers add 'error'
+_CHECK_FAILED_MESSAGE = 'Unable to check for C2PA credentials'
+_CHECK_FAILED_RESULT = MappingProxyType({
+    'present': False,
+    'message': _CHECK_FAILED_MESSAGE,
+    'note': 'This could be due to unsupported file format or corrupted image'
+})
+
+_FILE_NOT_FOUND_RESULT = MappingProxyType({
+    'present': False,
+    'error': 'Image file not found',
+    'message': _CHECK_FAILED_MESSAGE
+})
+
+# Parsed manifests of recently checked images, least recently used first.
+# Keys are (realpath, mtime_ns, size) for paths and a BLAKE2b digest for
+# bytes, so an edited file or different upload is read again.
+MANIFEST_CACHE_SIZE = 256
+_manifest_cache = OrderedDict()
+_manifest_cache_lock = threading.Lock()
+_MISS = object()
+
+
+def _manifest_key(image_path_or_bytes, mime_type):
+    """
+    Build the manifest cache key for an input
+
+    Returns:
+        tuple or None: Cache key, None for streams we can't hash cheaply
+
+    Raises:
+        FileNotFoundError: If a path input doesn't exist
+    """
+    if isinstance(image_path_or_bytes, str):
+        st = os.stat(image_path_or_bytes)
+        return ('path', os.path.realpath(image_path_or_bytes), st.st_mtime_ns, st.st_size)
+
+    if isinstance(image_path_or_bytes, ImageSource):
+        st = image_path_or_bytes.stat
+        return ('path', os.path.realpath(image_path_or_bytes.path), st.st_mtime_ns, st.st_size)
+
+    if isinstance(image_path_or_bytes, bytes):
+        buf = image_path_or_bytes
+    elif isinstance(image_path_or_bytes, BytesIO):
+        buf = image_path_or_bytes.getbuffer()
+    else:
+        return None
+
+    digest = hashlib.blake2b(buf, digest_size=16).hexdigest()
+    return ('bytes', digest, mime_type)
+
+
+# JUMBF markers: APP11 segments carry the "JP" common identifier (ISO 19566-5),
+# PNG stores the manifest store in a caBX chunk
+_JPEG_JUMBF_CI = b'JP'
+_PNG_JUMBF_CHUNKS = (b'caBX', b'jumb')
+
+# Leading bytes of the containers the C2PA reader understands (JPEG, PNG,
+# RIFF/WebP, GIF, TIFF/DNG), plus the ISO BMFF ftyp box (HEIF/AVIF/MP4).
+# Anything else - including empty or truncated input - can't carry a manifest.
+_CONTAINER_MAGIC = (b'\xff\xd8\xff', PNG_SIGNATURE, b'RIFF', b'GIF8', b'II*\x00', b'MM\x00*')
+_FTYP = b'ftyp'
+_MIN_CONTAINER_SIZE = 32
+
+
+# ISO BMFF major brands of HEIF still images; other ftyp brands are video
+_HEIF_BRANDS = (b'heic', b'heix', b'mif1', b'msf1')
+
+
+def _sniff_mime(head):
+    """
+    MIME type of an image from its first 12 bytes
+
+    Args:
+        head: bytes - Leading bytes of the image
+
+    Returns:
+        str: MIME type for the c2pa Reader, 'application/octet-stream' if unknown
+    """
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(PNG_SIGNATURE):
+        return 'image/png'
+    if head[4:8] == _FTYP:
+        return 'image/heif' if head[8:12] in _HEIF_BRANDS else 'video/mp4'
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head.startswith(b'GIF8'):
+        return 'image/gif'
+    if head.startswith((b'II*\x00', b'MM\x00*')):
+        return 'image/tiff'
+    return 'application/octet-stream'
+
+
+def _looks_like_container(buf):
+    """Whether buf is long enough and starts like a format C2PA supports"""
+    if len(buf) < _MIN_CONTAINER_SIZE:
+        return False
+    head = bytes(buf[:12])
+    return head.startswith(_CONTAINER_MAGIC) or head[4:8] == _FTYP
+
+
+def _scan_for_jumbf(buf):
+    """
+    Look for a JUMBF box in an in-memory image
+
+    Returns:
+        bool: Whether a JPEG/PNG carries JUMBF data. False for input too
+        short or unrecognized to hold a manifest, True for other supported
+        containers, which are left to the Reader.
+    """
+    if not _looks_like_container(buf):
+        return False
+
+    if buf[:2] == SOI:
+        for offset, _ in scan_segments(buf).get(APP11, ()):
+            if buf[offset + 4:offset + 6] == _JPEG_JUMBF_CI:
+                return True
+        return False
+
+    if buf[:8] == PNG_SIGNATURE:
+        offset = len(PNG_SIGNATURE)
+        size = len(buf)
+        while offset + 8 <= size:
+            (length,) = struct.unpack_from('>I', buf, offset)
+            chunk_type = buf[offset + 4:offset + 8]
+            if chunk_type in _PNG_JUMBF_CHUNKS:
+                return True
+            if chunk_type == b'IEND':
+                break
+            offset += 12 + length  # length + type + data + CRC
+        return False
+
+    return True
+
+
+def _has_jumbf(image_path_or_bytes):
+    """
+    Cheap pre-scan so images without a JUMBF box skip the Rust Reader
+
+    Args:
+        image_path_or_bytes: File path (str), bytes, BytesIO or ImageSource
+
+    Returns:
+        bool: False only when the image definitely has no C2PA manifest
+    """
+    if isinstance(image_path_or_bytes, ImageSource):
+        with image_path_or_bytes.view() as buf:
+            return _scan_for_jumbf(buf)
+
+    if isinstance(image_path_or_bytes, str):
+        try:
+            with open(image_path_or_bytes, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _scan_for_jumbf(mm)
+        except ValueError:
+            return False  # Empty file
+        except OSError:
+            return True  # Let the Reader report the problem
+
+    if isinstance(image_path_or_bytes, bytes):
+        return _scan_for_jumbf(image_path_or_bytes)
+
+    if isinstance(image_path_or_bytes, BytesIO):
+        with image_path_or_bytes.getbuffer() as buf:
+            return _scan_for_jumbf(buf)
+
+    return True
+
+
+def _c2pa_errors():
+    """
+    C2PA exception classes, for except clauses
+
+    c2pa loads its native library on import, so it is only imported once a
+    manifest actually has to be read. C2paError.Io doesn't subclass C2paError.
+    """
+    from c2pa import C2paError
+    return (C2paError, C2paError.Io)
+
+
+def _is_manifest_missing(e):
+    """Whether a C2PA error just means the image carries no manifest"""
+    error_str = str(e).lower()
+    return 'manifest' in error_str or 'not found' in error_str or 'jumbf' in error_str
+
+
+def _read_manifest(image_path_or_bytes, mime_type):
+    """
+    Run the c2pa Reader over an input and parse its manifest store
+
+    Returns:
+        dict or None: Parsed manifest store, None when no manifest is present
+
+    Raises:
+        C2paError: For C2PA errors other than a missing manifest
+    """
+    if not _has_jumbf(image_path_or_bytes):
+        logging.debug("C2PA: No JUMBF box found, skipping reader")
+        return None
+
+    from c2pa import Reader
+
+    # Handle file paths, shared mappings and byte objects
+    if isinstance(image_path_or_bytes, (str, ImageSource)):
+        # File path - let the Rust reader read the file natively
+        path = getattr(image_path_or_bytes, 'path', image_path_or_bytes)
+        logging.debug("C2PA: Reading from file path: %s", path)
+        reader_args = (path,)
+        reader_kwargs = {}
+    else:
+        # Bytes or BytesIO - need to use stream
+        if isinstance(image_path_or_bytes, bytes):
+            stream = BytesIO(image_path_or_bytes)
+        else:
+            stream = image_path_or_bytes
+            stream.seek(0)  # Reset to beginning
+
+        logging.debug("C2PA: Reading from byte stream")
+        # For streams, we need to specify the format
+        if not mime_type:
+            mime_type = _sniff_mime(stream.read(12))
+            stream.seek(0)
+        reader_args = (mime_type,)
+        reader_kwargs = {'stream': stream}
+
+    try:
+        # The context manager releases the native reader even if json() raises
+        with Reader(*reader_args, **reader_kwargs) as reader:
+            # Get the manifest data (returns JSON string)
+            manifest_json_str = reader.json()
+        logging.debug("C2PA: Got manifest JSON string: %s", bool(manifest_json_str))
+    except _c2pa_errors() as e:
+        # Path inputs report a missing manifest as C2paError.Io
+        if _is_manifest_missing(e):
+            return None
+        raise
+
+    # Parse the JSON string
+    if not manifest_json_str:
+        return None
+
+    return orjson.loads(manifest_json_str)
+
+
+def _cached_manifest(image_path_or_bytes, mime_type):
+    """
+    Parsed manifest store for an input, read through the manifest cache
+
+    Missing manifests are cached too - they are the common case.
+    """
+    key = _manifest_key(image_path_or_bytes, mime_type)
+    if key is None:
+        return _read_manifest(image_path_or_bytes, mime_type)
+
+    with _manifest_cache_lock:
+        manifest_json = _manifest_cache.get(key, _MISS)
+        if manifest_json is not _MISS:
+            _manifest_cache.move_to_end(key)
+            return manifest_json
+
+    manifest_json = _read_manifest(image_path_or_bytes, mime_type)
+
+    with _manifest_cache_lock:
+        _manifest_cache[key] = manifest_json
+        while len(_manifest_cache) > MANIFEST_CACHE_SIZE:
+            _manifest_cache.popitem(last=False)
+
+    return manifest_json
+
+
+def invalidate(path=None):
+    """
+    Drop cached manifests
+
+    Args:
+        path: str - Forget just this file (any version), or None to clear
+            the whole cache
+    """
+    with _manifest_cache_lock:
+        if path is None:
+            _manifest_cache.clear()
+            return
+
+        realpath = os.path.realpath(path)
+        stale = [key for key in _manifest_cache if key[0] == 'path' and key[1] == realpath]
+        for key in stale:
+            del _manifest_cache[key]
+
 
+# Reader validation states that mean the manifest checked out
+_VALID_STATES = ('Valid', 'Trusted')
 
-def check_c2pa(image_path_or_bytes):
+
+def _validation_outcome(manifest_json):
+    """
+    Whether the Reader validated a manifest store
+
+    The Reader reports validation_state ('Invalid', 'Valid' or 'Trusted')
+    and lists failures in validation_status. Without a state, only an
+    empty failure list counts as valid.
+
+    Args:
+        manifest_json: dict - Parsed manifest store
+
+    Returns:
+        tuple: (bool, str or None) - (valid, description of the failures)
+    """
+    statuses = manifest_json.get('validation_status') or []
+    if isinstance(statuses, dict):
+        statuses = [statuses]
+
+    issues = '; '.join(
+        status.get('explanation') or status.get('code') or 'Unknown issue'
+        for status in statuses if isinstance(status, dict)
+    ) or None
+
+    state = manifest_json.get('validation_state')
+    if state is not None:
+        valid = state in _VALID_STATES
+    else:
+        valid = not statuses
+
+    if not valid and issues is None:
+        issues = f'Validation state: {state}'
+    return valid, issues
+
+
+def _manifest_result(manifest_json):
+    """
+    Summarize a parsed manifest store as a check_c2pa result
+
+    Args:
+        manifest_json: dict - Parsed manifest store
+
+    Returns:
+        dict: check_c2pa result
+    """
+    logging.debug("C2PA: Parsed manifest, has active_manifest: %s", 'active_manifest' in manifest_json)
+    logging.debug("C2PA: Manifest keys: %s", manifest_json.keys())
+
+    # If no manifest found
+    if not manifest_json or 'active_manifest' not in manifest_json:
+        return dict(NO_MANIFEST_RESULT)
+
+    # C2PA manifest found! Extract information
+    active_manifest = manifest_json.get('active_manifest', {})
+    logging.debug("C2PA: active_manifest type: %s", type(active_manifest))
+
+    # If active_manifest is a string (URI reference), we need to get the actual manifest
+    if isinstance(active_manifest, str):
+        # The active_manifest is a reference - get it from manifests
+        manifests = manifest_json.get('manifests', {})
+        if active_manifest in manifests:
+            active_manifest = manifests[active_manifest]
+            logging.debug("C2PA: Resolved active_manifest from reference")
+        else:
+            logging.error("C2PA: Could not resolve active_manifest reference: %s", active_manifest)
+            return dict(_UNPARSEABLE_MANIFEST_RESULT)
+
+    # Validity comes from the Reader's own verdict on the store
+    valid, issues = _validation_outcome(manifest_json)
+    result = {
+        'present': True,
+        'valid': valid
+    }
+
+    # Extract claim generator (who created the credentials)
+    if 'claim_generator' in active_manifest:
+        result['claim_generator'] = active_manifest['claim_generator']
+
+    # Extract title if available
+    if 'title' in active_manifest:
+        result['title'] = active_manifest['title']
+
+    # Extract assertions (what claims are made), plus creator and identity
+    # information, in one pass over the assertion list
+    if 'assertions' in active_manifest:
+        labels = []
+        for assertion in active_manifest['assertions']:
+            label = assertion.get('label', '')
+            labels.append(label)
+
+            # Extract identity information (name, social media handles, etc.)
+            if label in ('cawg.identity', 'c2pa.identity'):
+                identity_data = assertion.get('data', {})
+                if identity_data:
+                    # The manifest store is cached - hand out a copy
+                    result['identity'] = deepcopy(identity_data)
+                    logging.debug("C2PA: Found identity data: %s", identity_data)
+
+            # Extract creation tool information
+            elif label in ('c2pa.actions', 'c2pa.actions.v2'):
+                for action in assertion.get('data', {}).get('actions', ()):
+                    if action.get('action') == 'c2pa.created':
+                        software_agent = action.get('softwareAgent', '')
+                        if software_agent:
+                            result['creator'] = software_agent
+                            break
+
+        result['assertions'] = labels
+
+    # Extract signature info
+    if 'signature_info' in active_manifest:
+        sig_info = active_manifest['signature_info']
+        result['signature_info'] = {
+            'issuer': sig_info.get('issuer', 'Unknown'),
+            'time': sig_info.get('time', None)
+        }
+
+    # Extract ingredients (if image was edited)
+    if 'ingredients' in active_manifest:
+        ingredients = active_manifest['ingredients']
+        result['ingredients'] = [
+            {
+                'title': ing.get('title', 'Unknown'),
+                'relationship': ing.get('relationship', 'Unknown')
+            }
+            for ing in ingredients
+        ]
+
+    if issues:
+        result['validation_issues'] = issues
+
+    result['message'] = 'C2PA credentials found and validated' if result['valid'] else 'C2PA credentials found but validation failed'
+
+    return result
+
+
+def check_c2pa(image_path_or_bytes, mime_type=None):
     """
     Check for C2PA credentials using c2pa-python library
 
     This implementation actually reads and validates C2PA manifests if present.
     Most UGC won't have C2PA credentials (adoption is emerging), but when they do,
-    this provides real verification.
+    this provides real verification. Parsed manifests are cached per file
+    version / content, see invalidate().
 
     Args:
-        image_path_or_bytes: File path (str) or bytes/BytesIO object
+        image_path_or_bytes: File path (str), bytes/BytesIO object or ImageSource
+        mime_type: MIME type of byte input (e.g. "image/png"), sniffed from its header if omitted
 
     Returns:
         dict: C2PA credential data
@@ -58,7 +516,7 @@ def check_c2pa(image_path_or_bytes):
         {
             "present": True,
             "valid": False,
-            "error": "Validation failed: ...",
+            "validation_issues": "claimSignature.mismatch: ...",
             "message": "C2PA credentials found but validation failed"
         }
 
@@ -70,181 +528,30 @@ def check_c2pa(image_path_or_bytes):
         }
     """
     try:
-        logging.info("C2PA: Starting check...")
-
-        reader = None
-
-        # Handle both file paths and byte objects
-        if isinstance(image_path_or_bytes, str):
-            # File path - use directly
-            logging.info(f"C2PA: Reading from file path: {image_path_or_bytes}")
-            reader = Reader(image_path_or_bytes)
-        else:
-            # Bytes or BytesIO - need to use stream
-            if isinstance(image_path_or_bytes, bytes):
-                stream = BytesIO(image_path_or_bytes)
-            else:
-                stream = image_path_or_bytes
-                stream.seek(0)  # Reset to beginning
-
-            logging.info("C2PA: Reading from byte stream")
-            # For streams, we need to specify the format
-            reader = Reader("image/jpeg", stream=stream)
-
-        # Get the manifest data (returns JSON string)
-        manifest_json_str = reader.json()
-        logging.info(f"C2PA: Got manifest JSON string: {bool(manifest_json_str)}")
-
-        # Close the reader
-        reader.close()
-
-        # Parse the JSON string
-        if not manifest_json_str:
-            return {
-                'present': False,
-                'message': 'No C2PA credentials found (most UGC lacks Content Credentials)',
-                'note': 'C2PA adoption is emerging - this is normal for social media content'
-            }
-
-        manifest_json = json.loads(manifest_json_str)
-        logging.info(f"C2PA: Parsed manifest, has active_manifest: {'active_manifest' in manifest_json}")
-        logging.info(f"C2PA: Manifest keys: {list(manifest_json.keys())}")
-
-        # If no manifest found
-        if not manifest_json or 'active_manifest' not in manifest_json:
-            return {
-                'present': False,
-                'message': 'No C2PA credentials found (most UGC lacks Content Credentials)',
-                'note': 'C2PA adoption is emerging - this is normal for social media content'
-            }
-
-        # C2PA manifest found! Extract information
-        active_manifest = manifest_json.get('active_manifest', {})
-        logging.info(f"C2PA: active_manifest type: {type(active_manifest)}")
-
-        # If active_manifest is a string (URI reference), we need to get the actual manifest
-        if isinstance(active_manifest, str):
-            # The active_manifest is a reference - get it from manifests
-            manifests = manifest_json.get('manifests', {})
-            if active_manifest in manifests:
-                active_manifest = manifests[active_manifest]
-                logging.info(f"C2PA: Resolved active_manifest from reference")
-            else:
-                logging.error(f"C2PA: Could not resolve active_manifest reference: {active_manifest}")
-                return {
-                    'present': False,
-                    'message': 'C2PA credentials found but could not be parsed',
-                    'note': 'Manifest structure is not in expected format'
-                }
-
-        result = {
-            'present': True,
-            'valid': True  # If we got here, basic validation passed
-        }
-
-        # Extract claim generator (who created the credentials)
-        if 'claim_generator' in active_manifest:
-            result['claim_generator'] = active_manifest['claim_generator']
-
-        # Extract title if available
-        if 'title' in active_manifest:
-            result['title'] = active_manifest['title']
-
-        # Extract assertions (what claims are made)
-        if 'assertions' in active_manifest:
-            result['assertions'] = [a.get('label', '') for a in active_manifest['assertions']]
+        logging.debug("C2PA: Starting check...")
 
-        # Extract signature info
-        if 'signature_info' in active_manifest:
-            sig_info = active_manifest['signature_info']
-            result['signature_info'] = {
-                'issuer': sig_info.get('issuer', 'Unknown'),
-                'time': sig_info.get('time', None)
-            }
-
-        # Extract creator and identity information from assertions
-        for assertion in active_manifest.get('assertions', []):
-            label = assertion.get('label', '')
+        manifest_json = _cached_manifest(image_path_or_bytes, mime_type)
+        if manifest_json is None:
+            return dict(NO_MANIFEST_RESULT)
 
-            # Extract identity information (name, social media handles, etc.)
-            if label in ['cawg.identity', 'c2pa.identity']:
-                identity_data = assertion.get('data', {})
-                if identity_data:
-                    result['identity'] = identity_data
-                    logging.info(f"C2PA: Found identity data: {identity_data}")
-
-            # Extract creation tool information
-            if label == 'c2pa.actions' or label == 'c2pa.actions.v2':
-                actions = assertion.get('data', {}).get('actions', [])
-                for action in actions:
-                    if action.get('action') == 'c2pa.created':
-                        software_agent = action.get('softwareAgent', '')
-                        if software_agent:
-                            result['creator'] = software_agent
-                            break
+        return _manifest_result(manifest_json)
 
-        # Extract ingredients (if image was edited)
-        if 'ingredients' in active_manifest:
-            ingredients = active_manifest['ingredients']
-            result['ingredients'] = [
-                {
-                    'title': ing.get('title', 'Unknown'),
-                    'relationship': ing.get('relationship', 'Unknown')
-                }
-                for ing in ingredients
-            ]
-
-        # Check validation status
-        validation_status = manifest_json.get('validation_status')
-        if validation_status:
-            # If there are validation issues
-            if 'status_code' in validation_status:
-                code = validation_status['status_code']
-                if code != 'passed':
-                    result['valid'] = False
-                    result['validation_issues'] = validation_status.get('status_message', 'Unknown issue')
-
-        result['message'] = 'C2PA credentials found and validated' if result['valid'] else 'C2PA credentials found but validation failed'
-
-        return result
-
-    except C2paError as e:
+    except _c2pa_errors() as e:
         # C2PA-specific errors
-        logging.error(f"C2PA: C2paError occurred: {str(e)}")
-        error_str = str(e).lower()
+        logging.error("C2PA: C2paError occurred: %s", e)
 
         # Check if it's specifically "no manifest found" error
-        if 'manifest' in error_str or 'not found' in error_str or 'jumbf' in error_str:
-            return {
-                'present': False,
-                'message': 'No C2PA credentials found (most UGC lacks Content Credentials)',
-                'note': 'C2PA adoption is emerging - this is normal for social media content'
-            }
+        if _is_manifest_missing(e):
+            return dict(NO_MANIFEST_RESULT)
 
         # Other C2PA errors
-        return {
-            'present': False,
-            'error': f'C2PA error: {str(e)}',
-            'message': 'Unable to check for C2PA credentials',
-            'note': 'This could be due to unsupported file format or corrupted image'
-        }
+        return {**_CHECK_FAILED_RESULT, 'error': f'C2PA error: {str(e)}'}
 
     except FileNotFoundError:
-        return {
-            'present': False,
-            'error': 'Image file not found',
-            'message': 'Unable to check for C2PA credentials'
-        }
+        return dict(_FILE_NOT_FOUND_RESULT)
 
     except Exception as e:
         # Other exceptions
-        import traceback
-        logging.error(f"C2PA: Unexpected exception: {type(e).__name__}: {str(e)}")
-        logging.error(f"C2PA: Full traceback:\n{traceback.format_exc()}")
-
-        return {
-            'present': False,
-            'error': f'Error checking C2PA: {str(e)}',
-            'message': 'Unable to check for C2PA credentials',
-            'note': 'This could be due to unsupported file format or corrupted image'
-        }
+        logging.error("C2PA: Unexpected exception: %s: %s", type(e).__name__, e, exc_info=True)
+
+        return {**_CHECK_FAILED_RESULT, 'error': f'Error checking C2PA: {str(e)}'}
@@ -0,0 +1,112 @@
+"""
+Dynamic Batcher Module
+Coalesces concurrent single-item async calls into batched calls
+
+Requests arrive one at a time, but some backends (the batched LLM analysis)
+are much cheaper per item when called with several at once. A dynamic
+batcher holds each call for at most timeout_ms, or until max_batch_size
+calls are waiting, then runs the batch function once and hands every caller
+its own result.
+
+Usage:
+    @dynamically(max_batch_size=16, timeout_ms=50)
+    async def analyze(signals_list):
+        return await synthesize_analysis_batch_async(signals_list)
+
+    result = await analyze(signals)  # one item in, one result out
+"""
+
+import asyncio
+import functools
+import weakref
+
+
+class DynamicBatcher:
+    """
+    Per-event-loop buffer of pending calls for one batch function
+
+    The batch function takes a list of items and returns a list of results
+    of the same length and order.
+    """
+
+    def __init__(self, batch_func, max_batch_size=16, timeout_ms=50):
+        self.batch_func = batch_func
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout_ms / 1000.0
+        # loop -> [pending (item, future) pairs, flush timer handle]
+        self._state = weakref.WeakKeyDictionary()
+        # The loop only keeps weak references to tasks - hold running
+        # batches here so they can't be collected while callers wait
+        self._tasks = set()
+
+    async def __call__(self, item):
+        loop = asyncio.get_running_loop()
+        state = self._state.get(loop)
+        if state is None:
+            state = self._state[loop] = [[], None]
+
+        future = loop.create_future()
+        state[0].append((item, future))
+
+        if len(state[0]) >= self.max_batch_size:
+            self._flush(loop)
+        elif state[1] is None:
+            state[1] = loop.call_later(self.timeout, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop):
+        """Start the batch call for everything pending on loop"""
+        state = self._state.get(loop)
+        if state is None or not state[0]:
+            return
+
+        pending, timer = state
+        state[0], state[1] = [], None
+        if timer is not None:
+            timer.cancel()
+
+        task = loop.create_task(self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending):
+        """Run one batch and resolve its callers' futures"""
+        try:
+            results = await self.batch_func([item for item, _ in pending])
+            if len(results) != len(pending):
+                raise ValueError(f"Batch function returned {len(results)} results for {len(pending)} items")
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def dynamically(max_batch_size=16, timeout_ms=50):
+    """
+    Turn an async batch function into a single-item async function
+
+    Args:
+        max_batch_size: int - Run the batch as soon as this many calls wait
+        timeout_ms: int - Longest a call waits for others to join its batch
+
+    Returns:
+        Decorator; the decorated function is awaited with one item and
+        returns that item's result
+    """
+    def decorator(batch_func):
+        batcher = DynamicBatcher(batch_func, max_batch_size, timeout_ms)
+
+        @functools.wraps(batch_func)
+        async def wrapper(item):
+            return await batcher(item)
+
+        wrapper.batcher = batcher
+        return wrapper
+
+    return decorator
@@ -2,14 +2,122 @@
 EXIF Analyzer Module
 Extracts and parses EXIF metadata from images
 
-Uses exifread library to extract camera metadata, timestamps, GPS coordinates,
-and other technical information from image files.
+Extracts camera metadata, timestamps, GPS coordinates, and other technical
+information from image files. JPEG/PNG EXIF is decoded tag-by-tag with
+exif_reader; other formats (HEIC, TIFF, WebP, ...) go through exifread.
 """
 
-import exifread
-from datetime import datetime
+import logging
+import re
+from dataclasses import dataclass, field, fields
+from fractions import Fraction
 from io import BytesIO
-from PIL import Image
+from types import MappingProxyType
+from typing import Optional
+from PIL.ExifTags import Base, GPS, IFD
+
+from utils.exif_reader import find_exif_block, read_tags
+from utils.image_io import open_header, read_header
+from utils.image_source import ImageSource
+
+
+# Result when an image carries no EXIF block. Read-only - callers return a
+# dict() copy.
+NO_EXIF_RESULT = MappingProxyType({
+    'error': 'No EXIF metadata found (common for screenshots and social media images)',
+    'has_exif': False
+})
+
+
+@dataclass(slots=True)
+class ExifResult:
+    """
+    Structured EXIF fields, None when absent
+
+    Fixed slots instead of a per-image dict, for callers that process many
+    images. as_dict() gives the extract_exif result.
+    """
+    has_exif: bool = False
+    camera_make: Optional[str] = None
+    camera_model: Optional[str] = None
+    timestamp: Optional[str] = None
+    gps_latitude: Optional[float] = None
+    gps_longitude: Optional[float] = None
+    gps_latitude_ref: Optional[str] = None
+    gps_longitude_ref: Optional[str] = None
+    software: Optional[str] = None
+    orientation: Optional[int] = None
+    flash: Optional[bool] = None
+    focal_length: Optional[float] = None
+    iso: Optional[int] = None
+    f_number: Optional[float] = None
+    exposure_time: Optional[str] = None
+    error: Optional[str] = None
+    # A datetime tag was present - timestamp is reported even if unparseable
+    _timestamp_tag: bool = field(default=False, repr=False)
+
+    def as_dict(self):
+        """Fields that are set, as a plain dict"""
+        result = {}
+        for name in _EXIF_RESULT_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        if self._timestamp_tag and 'timestamp' not in result:
+            result['timestamp'] = None
+        return result
+
+
+_EXIF_RESULT_FIELDS = tuple(f.name for f in fields(ExifResult) if not f.name.startswith('_'))
+
+# Tags we read: exifread tag name -> (IFD pointer tag, tag id). None is IFD0.
+_TAGS = {
+    'Image Make': (None, Base.Make),
+    'Image Model': (None, Base.Model),
+    'Image Software': (None, Base.Software),
+    'Image Orientation': (None, Base.Orientation),
+    'Image DateTime': (None, Base.DateTime),
+    'EXIF DateTimeOriginal': (IFD.Exif, Base.DateTimeOriginal),
+    'EXIF Flash': (IFD.Exif, Base.Flash),
+    'EXIF FocalLength': (IFD.Exif, Base.FocalLength),
+    'EXIF ISOSpeedRatings': (IFD.Exif, Base.ISOSpeedRatings),
+    'EXIF FNumber': (IFD.Exif, Base.FNumber),
+    'EXIF ExposureTime': (IFD.Exif, Base.ExposureTime),
+    'GPS GPSLatitude': (IFD.GPSInfo, GPS.GPSLatitude),
+    'GPS GPSLatitudeRef': (IFD.GPSInfo, GPS.GPSLatitudeRef),
+    'GPS GPSLongitude': (IFD.GPSInfo, GPS.GPSLongitude),
+    'GPS GPSLongitudeRef': (IFD.GPSInfo, GPS.GPSLongitudeRef),
+}
+
+# Same tags grouped for exif_reader: {IFD: {tag id: tag name}}
+_TAGS_BY_IFD = {
+    ifd: {tag_id: name for name, (tag_ifd, tag_id) in _TAGS.items() if tag_ifd == ifd}
+    for ifd in (None, IFD.Exif, IFD.GPSInfo)
+}
+
+# EXIF datetime: YYYY:MM:DD HH:MM:SS
+_DATETIME_RE = re.compile(r'(\d{4}):(\d{2}):(\d{2}) (\d{2}):(\d{2}):(\d{2})')
+
+# The wanted EXIF sub-IFD tags all sort before MakerNote (0x927C), so
+# exifread can stop each IFD there instead of walking to the end
+_STOP_TAG = 'MakerNote'
+
+
+def _ratio_or_none(value):
+    """
+    Convert a rational tag value to float
+
+    Args:
+        value: Rational with numerator/denominator (exif_reader Rational or
+            exifread Ratio)
+
+    Returns:
+        float: Value, or None for a zero denominator or non-rational
+    """
+    denominator = getattr(value, 'denominator', None)
+    if not denominator:
+        return None
+    return value.numerator / denominator
 
 
 def _convert_to_degrees(value):
@@ -17,19 +125,157 @@ def _convert_to_degrees(value):
     Convert GPS coordinates to decimal degrees
 
     Args:
-        value: GPS coordinate in degrees/minutes/seconds format
+        value: GPS coordinate as (degrees, minutes, seconds) rationals
 
     Returns:
         float: Decimal degrees
     """
+    if not isinstance(value, tuple) or len(value) != 3:
+        return None
+
+    d, m, s = (_ratio_or_none(part) for part in value)
+    if d is None or m is None or s is None:
+        return None
+    return d + (m / 60.0) + (s / 3600.0)
+
+
+def convert_to_degrees_batch(nums, dens):
+    """
+    Convert many GPS coordinates to decimal degrees in one vector operation
+
+    For pipelines that collect coordinates from many images; single images
+    go through _convert_to_degrees. Uses numpy.
+
+    Args:
+        nums: (N, 3) integer array-like of degree/minute/second numerators
+        dens: (N, 3) integer array-like of the matching denominators
+
+    Returns:
+        numpy.ndarray: N decimal degrees, NaN where a denominator is zero
+    """
+    import numpy as np
+
+    nums = np.asarray(nums, dtype=np.float64)
+    dens = np.asarray(dens, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        degrees = nums[:, 0] / dens[:, 0] + nums[:, 1] / (dens[:, 1] * 60) + nums[:, 2] / (dens[:, 2] * 3600)
+
+    degrees[(dens == 0).any(axis=1)] = np.nan
+    return degrees
+
+
+def _text(value):
+    """Tag value as a whitespace-stripped string"""
+    if isinstance(value, bytes):
+        value = value.decode('ascii', 'replace')
+    return str(value).strip()
+
+
+def _to_int(value):
+    """Tag value as an int, or None if it isn't a single integer"""
+    return value if isinstance(value, int) else None
+
+
+def _flash_fired(value):
+    """Whether the EXIF Flash value says the flash fired (bit 0)"""
+    return bool(value & 1) if isinstance(value, int) else None
+
+
+def _exposure(value):
+    """Exposure time rational as a fraction string, e.g. '1/120'"""
+    denominator = getattr(value, 'denominator', None)
+    if not denominator:
+        return None
+    return str(Fraction(value.numerator, denominator))
+
+
+# Single-tag fields: tag name -> (result key, converter).
+# Converters return None when the value can't be used.
+_TAG_FIELDS = {
+    'Image Make': ('camera_make', _text),
+    'Image Model': ('camera_model', _text),
+    'Image Software': ('software', _text),
+    'Image Orientation': ('orientation', _to_int),
+    'EXIF Flash': ('flash', _flash_fired),
+    'EXIF FocalLength': ('focal_length', _ratio_or_none),
+    'EXIF ISOSpeedRatings': ('iso', _to_int),
+    'EXIF FNumber': ('f_number', _ratio_or_none),
+    'EXIF ExposureTime': ('exposure_time', _exposure),
+}
+
+
+def _fast_tags(buf):
+    """
+    Read the wanted tags with exif_reader
+
+    Args:
+        buf: bytes or memoryview - Image data
+
+    Returns:
+        dict: {tag name: value} for the tags present, None when the image
+        has no EXIF block
+
+    Raises:
+        Exception: If the format isn't JPEG/PNG or the EXIF block is malformed
+    """
+    block = find_exif_block(buf)
+    if block is None:
+        raise ValueError('Unsupported format for exif_reader')
+    if not block:
+        return None
+    return read_tags(block, _TAGS_BY_IFD)
+
+
+def _read_tags(buf, stream):
+    """
+    Read the wanted tags, falling back to exifread
+
+    Args:
+        buf: bytes or memoryview - Image data for exif_reader
+        stream: Seekable file object over the same data for exifread
+
+    Returns:
+        dict or None: See _fast_tags
+    """
     try:
-        d = float(value.values[0].num) / float(value.values[0].den)
-        m = float(value.values[1].num) / float(value.values[1].den)
-        s = float(value.values[2].num) / float(value.values[2].den)
-        return d + (m / 60.0) + (s / 3600.0)
-    except (AttributeError, ZeroDivisionError, IndexError):
+        return _fast_tags(buf)
+    except Exception:
+        # Not JPEG/PNG (HEIC, TIFF, ...) or malformed - fall back to exifread
+        return _exifread_tags(stream)
+
+
+def _exifread_tags(f):
+    """
+    Read the wanted tags with exifread (fallback for other formats)
+
+    Values are unwrapped to match exif_reader's: strings, ints, rationals,
+    and tuples for multi-value tags.
+
+    Returns:
+        dict: {tag name: value} for the tags present, None when the image
+        has no EXIF block
+    """
+    import exifread  # Only needed for the rare non-JPEG/PNG image
+
+    f.seek(0)
+    tags = exifread.process_file(f, details=False, stop_tag=_STOP_TAG)
+    if not tags:
         return None
 
+    result = {}
+    for name in _TAGS:
+        if name not in tags:
+            continue
+        values = tags[name].values
+        if isinstance(values, (str, bytes)):
+            result[name] = values
+        elif len(values) == 1:
+            result[name] = values[0]
+        else:
+            result[name] = tuple(values)
+    return result
+
 
 def _parse_datetime(dt_string):
     """
@@ -41,162 +287,138 @@ def _parse_datetime(dt_string):
     Returns:
         str: ISO 8601 formatted datetime or None
     """
-    try:
-        dt = datetime.strptime(str(dt_string), '%Y:%M:%D %H:%M:%S')
-        return dt.isoformat() + 'Z'
-    except (ValueError, AttributeError):
+    match = _DATETIME_RE.match(str(dt_string))
+    if not match:
         return None
+    return f"{match[1]}-{match[2]}-{match[3]}T{match[4]}:{match[5]}:{match[6]}Z"
 
 
-def extract_exif(image_path_or_bytes):
+def read_exif(image_path_or_bytes):
     """
-    Extract EXIF metadata from image
+    Extract EXIF metadata from image as an ExifResult
+
+    See extract_exif for the fields; absent fields are None.
 
     Args:
-        image_path_or_bytes: File path (str) or bytes/BytesIO object
+        image_path_or_bytes: File path (str), bytes/BytesIO object, open
+            binary file or ImageSource. Paths and files are read only up to
+            the image data; an ImageSource is scanned in place.
 
     Returns:
-        dict: EXIF metadata with standardized fields
-
-    Returns structure:
-        {
-            "camera_make": "Apple",
-            "camera_model": "iPhone 14 Pro",
-            "timestamp": "2024-10-15T14:23:45Z",
-            "gps_latitude": 31.5017,
-            "gps_longitude": 34.4668,
-            "gps_latitude_ref": "N",
-            "gps_longitude_ref": "E",
-            "software": "iOS 17.1.2",
-            "orientation": 1,
-            "flash": False,
-            "focal_length": 24.0,
-            "iso": 100,
-            "f_number": 1.8,
-            "exposure_time": "1/120",
-            "has_exif": True
-        }
-
-    Error returns:
-        {"error": "No EXIF metadata found", "has_exif": False}
-        {"error": "Unable to read image file", "has_exif": False}
+        ExifResult: Extracted fields, or has_exif=False with an error
     """
     try:
-        # Handle both file paths and byte objects
-        if isinstance(image_path_or_bytes, (bytes, BytesIO)):
+        # Handle file paths, byte objects and shared mappings
+        if isinstance(image_path_or_bytes, ImageSource):
+            f = None
+        elif isinstance(image_path_or_bytes, (bytes, BytesIO)):
             if isinstance(image_path_or_bytes, bytes):
                 f = BytesIO(image_path_or_bytes)
             else:
                 f = image_path_or_bytes
                 f.seek(0)  # Reset to beginning
+        elif hasattr(image_path_or_bytes, 'read'):
+            # Open file - read just the metadata prefix
+            image_path_or_bytes.seek(0)
+            f = BytesIO(read_header(image_path_or_bytes))
         else:
-            # File path
+            # File path - read just the metadata prefix
             try:
-                f = open(image_path_or_bytes, 'rb')
+                f = open_header(image_path_or_bytes)
             except (FileNotFoundError, IOError) as e:
-                return {
-                    'error': f'Unable to read image file: {str(e)}',
-                    'has_exif': False
-                }
+                return ExifResult(error=f'Unable to read image file: {str(e)}')
 
         # Read EXIF tags
-        tags = exifread.process_file(f, details=False)
-
-        # Close file if we opened it
-        if isinstance(image_path_or_bytes, str):
-            f.close()
+        if f is None:
+            with image_path_or_bytes.view() as buf, image_path_or_bytes.as_stream() as stream:
+                tags = _read_tags(buf, stream)
+        else:
+            with f.getbuffer() as buf:
+                tags = _read_tags(buf, f)
 
         # If no EXIF data found
-        if not tags or len(tags) == 0:
-            return {
-                'error': 'No EXIF metadata found (common for screenshots and social media images)',
-                'has_exif': False
-            }
+        if tags is None:
+            return ExifResult(error=NO_EXIF_RESULT['error'])
 
         # Debug: log what tags we found
-        import logging
-        logging.info(f"EXIF tags found: {list(tags.keys())}")
+        logging.debug("EXIF tags found: %s", tags.keys())
 
         # Extract and structure EXIF data
-        result = {'has_exif': True}
-
-        # Camera information
-        if 'Image Make' in tags:
-            result['camera_make'] = str(tags['Image Make']).strip()
+        result = ExifResult(has_exif=True)
 
-        if 'Image Model' in tags:
-            result['camera_model'] = str(tags['Image Model']).strip()
+        # Camera, software and exposure fields
+        for name, (key, convert) in _TAG_FIELDS.items():
+            if name in tags:
+                value = convert(tags[name])
+                if value is not None:
+                    setattr(result, key, value)
 
         # Timestamp
         if 'EXIF DateTimeOriginal' in tags:
-            result['timestamp'] = _parse_datetime(tags['EXIF DateTimeOriginal'])
+            result.timestamp = _parse_datetime(tags['EXIF DateTimeOriginal'])
+            result._timestamp_tag = True
         elif 'Image DateTime' in tags:
-            result['timestamp'] = _parse_datetime(tags['Image DateTime'])
+            result.timestamp = _parse_datetime(tags['Image DateTime'])
+            result._timestamp_tag = True
 
         # GPS coordinates
         if 'GPS GPSLatitude' in tags and 'GPS GPSLatitudeRef' in tags:
             lat = _convert_to_degrees(tags['GPS GPSLatitude'])
-            lat_ref = str(tags['GPS GPSLatitudeRef'])
+            lat_ref = _text(tags['GPS GPSLatitudeRef'])
             if lat is not None:
-                result['gps_latitude'] = lat if lat_ref == 'N' else -lat
-                result['gps_latitude_ref'] = lat_ref
+                result.gps_latitude = lat if lat_ref == 'N' else -lat
+                result.gps_latitude_ref = lat_ref
 
         if 'GPS GPSLongitude' in tags and 'GPS GPSLongitudeRef' in tags:
             lon = _convert_to_degrees(tags['GPS GPSLongitude'])
-            lon_ref = str(tags['GPS GPSLongitudeRef'])
+            lon_ref = _text(tags['GPS GPSLongitudeRef'])
             if lon is not None:
-                result['gps_longitude'] = lon if lon_ref == 'E' else -lon
-                result['gps_longitude_ref'] = lon_ref
+                result.gps_longitude = lon if lon_ref == 'E' else -lon
+                result.gps_longitude_ref = lon_ref
 
-        # Software
-        if 'Image Software' in tags:
-            result['software'] = str(tags['Image Software']).strip()
-
-        # Orientation
-        if 'Image Orientation' in tags:
-            try:
-                result['orientation'] = int(str(tags['Image Orientation']))
-            except ValueError:
-                pass
+        return result
 
-        # Flash
-        if 'EXIF Flash' in tags:
-            flash_value = str(tags['EXIF Flash'])
-            result['flash'] = 'Flash fired' in flash_value
+    except Exception as e:
+        return ExifResult(error=f'Error processing EXIF data: {str(e)}')
 
-        # Focal length
-        if 'EXIF FocalLength' in tags:
-            try:
-                focal = tags['EXIF FocalLength']
-                if hasattr(focal, 'values') and len(focal.values) > 0:
-                    result['focal_length'] = float(focal.values[0].num) / float(focal.values[0].den)
-            except (AttributeError, ZeroDivisionError, IndexError):
-                pass
-
-        # ISO
-        if 'EXIF ISOSpeedRatings' in tags:
-            try:
-                result['iso'] = int(str(tags['EXIF ISOSpeedRatings']))
-            except ValueError:
-                pass
 
-        # F-number (aperture)
-        if 'EXIF FNumber' in tags:
-            try:
-                fnumber = tags['EXIF FNumber']
-                if hasattr(fnumber, 'values') and len(fnumber.values) > 0:
-                    result['f_number'] = float(fnumber.values[0].num) / float(fnumber.values[0].den)
-            except (AttributeError, ZeroDivisionError, IndexError):
-                pass
+def extract_exif(image_path_or_bytes):
+    """
+    Extract EXIF metadata from image
 
-        # Exposure time
-        if 'EXIF ExposureTime' in tags:
-            result['exposure_time'] = str(tags['EXIF ExposureTime'])
+    Args:
+        image_path_or_bytes: File path (str), bytes/BytesIO object, open
+            binary file or ImageSource. Paths and files are read only up to
+            the image data; an ImageSource is scanned in place.
 
-        return result
+    Returns:
+        dict: EXIF metadata with standardized fields
 
-    except Exception as e:
-        return {
-            'error': f'Error processing EXIF data: {str(e)}',
-            'has_exif': False
+    Returns structure:
+        {
+            "camera_make": "Apple",
+            "camera_model": "iPhone 14 Pro",
+            "timestamp": "2024-10-15T14:23:45Z",
+            "gps_latitude": 31.5017,
+            "gps_longitude": 34.4668,
+            "gps_latitude_ref": "N",
+            "gps_longitude_ref": "E",
+            "software": "iOS 17.1.2",
+            "orientation": 1,
+            "flash": False,
+            "focal_length": 24.0,
+            "iso": 100,
+            "f_number": 1.8,
+            "exposure_time": "1/120",
+            "has_exif": True
         }
+
+    Error returns:
+        {"error": "No EXIF metadata found", "has_exif": False}
+        {"error": "Unable to read image file", "has_exif": False}
+    """
+    result = read_exif(image_path_or_bytes)
+    if result.error == NO_EXIF_RESULT['error']:
+        # Most uploads: copy the prebuilt result instead of walking every field
+        return dict(NO_EXIF_RESULT)
+    return result.as_dict()
@@ -0,0 +1,166 @@
+"""
+EXIF Reader Module
+Minimal TIFF IFD decoder for the handful of tags the EXIF analyzer uses
+
+exifread builds a Python object (with Ratio wrappers) for every tag of every
+IFD. EXIF in JPEG APP1 and PNG eXIf blocks is a plain TIFF structure, so this
+walks the IFD entry tables with struct and decodes only the requested tags.
+Anything it can't locate or parse is left to exifread.
+"""
+
+import struct
+from collections import namedtuple
+
+from utils.image_io import PNG_SIGNATURE
+from utils.jpeg_scanner import APP1, EXIF_HEADER, scan_segments
+
+
+# Rational tag value, same numerator/denominator interface as exifread's Ratio
+Rational = namedtuple('Rational', ['numerator', 'denominator'])
+
+# TIFF field types: type -> (struct code, item size)
+_BYTE, _ASCII, _SHORT, _LONG, _RATIONAL, _UNDEFINED, _SLONG, _SRATIONAL = 1, 2, 3, 4, 5, 7, 9, 10
+_FIELD_TYPES = {
+    _BYTE: ('B', 1),
+    _ASCII: ('s', 1),
+    _SHORT: ('H', 2),
+    _LONG: ('L', 4),
+    _RATIONAL: ('L', 8),
+    _UNDEFINED: ('s', 1),
+    _SLONG: ('l', 4),
+    _SRATIONAL: ('l', 8),
+}
+
+_PNG_EXIF_CHUNK = b'eXIf'
+
+
+def find_exif_block(buf):
+    """
+    Locate the TIFF-structured EXIF block of a JPEG or PNG
+
+    Args:
+        buf: bytes or memoryview of the image (or its metadata prefix)
+
+    Returns:
+        bytes: The TIFF block, b'' when the image has no EXIF block, or None
+        for formats this module doesn't read
+    """
+    segments = scan_segments(buf)
+    if segments is not None:
+        for offset, length in segments.get(APP1, ()):
+            body = bytes(buf[offset + 4:offset + length])
+            if body.startswith(EXIF_HEADER):
+                return body[len(EXIF_HEADER):]
+        return b''
+
+    if buf[:8] == PNG_SIGNATURE:
+        offset = len(PNG_SIGNATURE)
+        size = len(buf)
+        while offset + 8 <= size:
+            (length,) = struct.unpack_from('>I', buf, offset)
+            chunk_type = bytes(buf[offset + 4:offset + 8])
+            if chunk_type == _PNG_EXIF_CHUNK:
+                return bytes(buf[offset + 8:offset + 8 + length])
+            if chunk_type == b'IEND':
+                break
+            offset += 12 + length  # length + type + data + CRC
+        return b''
+
+    return None
+
+
+def _decode(tiff, endian, field_type, count, value_offset):
+    """Decode one IFD entry value"""
+    code, size = _FIELD_TYPES[field_type]
+    if value_offset + count * size > len(tiff):
+        raise ValueError('Tag value runs past the EXIF block')
+
+    if field_type in (_ASCII, _UNDEFINED):
+        raw = tiff[value_offset:value_offset + count]
+        if field_type == _UNDEFINED:
+            return raw
+        return raw.split(b'\x00', 1)[0].decode('utf-8', 'replace')
+
+    if field_type in (_RATIONAL, _SRATIONAL):
+        parts = struct.unpack_from(f'{endian}{2 * count}{code}', tiff, value_offset)
+        values = tuple(Rational(parts[i], parts[i + 1]) for i in range(0, len(parts), 2))
+    else:
+        values = struct.unpack_from(f'{endian}{count}{code}', tiff, value_offset)
+
+    return values[0] if count == 1 else values
+
+
+def _read_ifd(tiff, endian, ifd_offset, wanted):
+    """
+    Decode the wanted entries of one IFD
+
+    Args:
+        tiff: bytes - TIFF block
+        endian: str - struct byte-order prefix
+        ifd_offset: int - IFD offset within the block
+        wanted: dict - {tag id: result name}
+
+    Returns:
+        dict: {tag id: value} for the wanted tags present
+    """
+    (entries,) = struct.unpack_from(f'{endian}H', tiff, ifd_offset)
+    values = {}
+
+    for i in range(entries):
+        entry = ifd_offset + 2 + 12 * i
+        tag, field_type, count = struct.unpack_from(f'{endian}HHL', tiff, entry)
+        if tag not in wanted or field_type not in _FIELD_TYPES or count == 0:
+            continue
+
+        # Values up to 4 bytes are stored inline, larger ones at an offset
+        if count * _FIELD_TYPES[field_type][1] <= 4:
+            value_offset = entry + 8
+        else:
+            (value_offset,) = struct.unpack_from(f'{endian}L', tiff, entry + 8)
+
+        values[tag] = _decode(tiff, endian, field_type, count, value_offset)
+
+    return values
+
+
+def read_tags(tiff, wanted):
+    """
+    Decode selected tags from a TIFF-structured EXIF block
+
+    Args:
+        tiff: bytes - TIFF block (as returned by find_exif_block)
+        wanted: dict - {sub-IFD pointer tag or None for IFD0: {tag id: name}}
+
+    Returns:
+        dict: {name: value} for the wanted tags present. Strings, ints,
+        bytes, Rational, or tuples of these for multi-value tags.
+
+    Raises:
+        ValueError: If the block isn't a TIFF structure or a value runs past it
+        struct.error: If an IFD points outside the block
+    """
+    if tiff[:4] == b'II*\x00':
+        endian = '<'
+    elif tiff[:4] == b'MM\x00*':
+        endian = '>'
+    else:
+        raise ValueError('Not a TIFF header')
+
+    (ifd0_offset,) = struct.unpack_from(f'{endian}L', tiff, 4)
+
+    # IFD0 also holds the sub-IFD pointers
+    ifd0_wanted = dict(wanted.get(None, {}))
+    pointers = [pointer for pointer in wanted if pointer is not None]
+    for pointer in pointers:
+        ifd0_wanted.setdefault(pointer, None)
+
+    ifd0 = _read_ifd(tiff, endian, ifd0_offset, ifd0_wanted)
+    tags = {wanted[None][tag]: value for tag, value in ifd0.items() if tag in wanted.get(None, {})}
+
+    for pointer in pointers:
+        sub_offset = ifd0.get(pointer)
+        if isinstance(sub_offset, int) and sub_offset:
+            sub_ifd = _read_ifd(tiff, endian, sub_offset, wanted[pointer])
+            tags.update((wanted[pointer][tag], value) for tag, value in sub_ifd.items())
+
+    return tags
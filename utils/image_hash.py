@@ -0,0 +1,114 @@
+"""
+Image Hash Module
+Perceptual hashing for recognizing re-hosted or resized copies of an image
+
+Uses a 64-bit difference hash (dHash) computed with Pillow: the image is
+shrunk to 9x8 grayscale and each bit records whether a pixel is brighter
+than its right-hand neighbour. Resizing, recompression and light edits
+change only a few bits, so near-duplicates are found by Hamming distance.
+"""
+
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image
+
+from utils.image_source import ImageSource
+
+
+DEFAULT_MAX_DISTANCE = 6
+
+
+def image_dhash(image_path_or_bytes):
+    """
+    Compute a 64-bit difference hash
+
+    Args:
+        image_path_or_bytes: File path (str), bytes/BytesIO object or ImageSource
+
+    Returns:
+        int: 64-bit perceptual hash, or None if the image can't be decoded
+    """
+    if isinstance(image_path_or_bytes, ImageSource):
+        with image_path_or_bytes.as_stream() as stream:
+            return image_dhash(stream)
+
+    try:
+        if isinstance(image_path_or_bytes, bytes):
+            source = BytesIO(image_path_or_bytes)
+        else:
+            source = image_path_or_bytes
+
+        with Image.open(source) as img:
+            img.draft('L', (18, 16))  # Let JPEG decoder downscale cheaply
+            pixels = list(img.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+
+        value = 0
+        for row in range(8):
+            for col in range(8):
+                left = pixels[row * 9 + col]
+                right = pixels[row * 9 + col + 1]
+                value = (value << 1) | (1 if left > right else 0)
+        return value
+
+    except Exception:
+        return None
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+class PerceptualCache:
+    """
+    Bounded LRU map from perceptual hash to a cached result
+
+    Lookups return the closest entry within max_distance bits.
+    """
+
+    def __init__(self, max_entries=1024, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, image_hash):
+        """
+        Find a cached result for a perceptually similar image
+
+        Args:
+            image_hash: int from image_dhash
+
+        Returns:
+            Cached value or None
+        """
+        with self._lock:
+            best_hash = None
+            best_distance = self.max_distance + 1
+
+            for cached_hash in self._data:
+                distance = hamming_distance(image_hash, cached_hash)
+                if distance < best_distance:
+                    best_hash = cached_hash
+                    best_distance = distance
+                    if distance == 0:
+                        break
+
+            if best_hash is None:
+                return None
+
+            self._data.move_to_end(best_hash)
+            return self._data[best_hash]
+
+    def set(self, image_hash, value):
+        """Store a result under a perceptual hash"""
+        with self._lock:
+            self._data[image_hash] = value
+            self._data.move_to_end(image_hash)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,105 @@
+"""
+Image I/O Module
+Reads just the metadata prefix of an image instead of the whole file
+
+EXIF lives ahead of the compressed image data (JPEG APP1 before the first
+scan, PNG eXIf before IDAT), so the EXIF parser only needs the bytes up to
+that point. The prefix is read in growing chunks, starting at 64KB and
+doubling until the image data is reached.
+"""
+
+import struct
+from io import BytesIO
+
+from utils.jpeg_scanner import SOI, SOS, scan_segments
+
+
+DEFAULT_HEADER_BYTES = 65536  # One full APP1 segment fits in the first read
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_DATA_CHUNKS = (b'IDAT', b'IEND')
+
+
+def _png_metadata_complete(buf):
+    """Whether buf reaches the first IDAT/IEND chunk of a PNG"""
+    offset = len(PNG_SIGNATURE)
+    size = len(buf)
+
+    while offset + 8 <= size:
+        (length,) = struct.unpack_from('>I', buf, offset)
+        if buf[offset + 4:offset + 8] in _PNG_DATA_CHUNKS:
+            return True
+        offset += 12 + length  # length + type + data + CRC
+
+    return False
+
+
+def metadata_complete(buf):
+    """
+    Check whether a prefix holds every metadata segment of the image
+
+    Args:
+        buf: bytes - Leading bytes of the file
+
+    Returns:
+        bool: True once the prefix reaches the image data, False if more
+        bytes are needed. None for formats we can't walk (TIFF, WebP, HEIC,
+        ...) where metadata may be anywhere in the file.
+    """
+    if buf[:2] == SOI:
+        segments = scan_segments(buf)
+        return segments is not None and SOS in segments
+
+    if buf[:8] == PNG_SIGNATURE:
+        return _png_metadata_complete(buf)
+
+    return None
+
+
+def read_header(f, max_bytes=DEFAULT_HEADER_BYTES):
+    """
+    Read the metadata prefix of an open image file
+
+    Starts with max_bytes and doubles the read until the image data is
+    reached or the file ends. Unknown formats are read in full.
+
+    Args:
+        f: Binary file object positioned at the start of the image
+        max_bytes: int - Size of the first read
+
+    Returns:
+        bytes: Prefix containing all metadata segments
+    """
+    buf = f.read(max_bytes)
+    eof = len(buf) < max_bytes
+
+    while not eof:
+        complete = metadata_complete(buf)
+        if complete:
+            break
+
+        # Unknown layout: take the rest of the file; otherwise double
+        want = -1 if complete is None else len(buf)
+        chunk = f.read(want)
+        eof = want == -1 or len(chunk) < want
+        buf += chunk
+
+    return buf
+
+
+def open_header(path, max_bytes=DEFAULT_HEADER_BYTES):
+    """
+    Open an image file and return its metadata prefix as a stream
+
+    Args:
+        path: str - Image file path
+        max_bytes: int - Size of the first read
+
+    Returns:
+        BytesIO: Prefix containing all metadata segments
+
+    Raises:
+        OSError: If the file can't be opened
+    """
+    with open(path, 'rb') as f:
+        return BytesIO(read_header(f, max_bytes))
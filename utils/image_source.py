@@ -0,0 +1,65 @@
+"""
+Image Source Module
+One read-only memory map of an image file shared by all analyzers
+
+Without it, the JPEG scan, EXIF extraction, C2PA pre-scan and perceptual
+hash each open and read the same temp file. An ImageSource maps the file
+once; analyzers scan it through view() or read it through as_stream(),
+both backed by the same page-cache pages with no copies.
+"""
+
+import mmap
+import os
+
+
+class ImageSource:
+    """
+    Read-only mapping of an image file
+
+    Usage:
+        with ImageSource(path) as src:
+            exif = extract_exif(src)
+            c2pa = check_c2pa(src)
+
+    Safe to share across threads: view() is read-only and every
+    as_stream() call returns a stream with its own position.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self.stat = os.fstat(self._file.fileno())
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # ValueError: empty files can't be mapped
+            self._file.close()
+            raise
+
+    def view(self):
+        """
+        Zero-copy view of the whole file
+
+        Returns:
+            memoryview: Release it (use as a context manager) before close()
+        """
+        return memoryview(self._mm)
+
+    def as_stream(self):
+        """
+        Independent file-like reader over the same mapping
+
+        Returns:
+            mmap.mmap: Seekable read-only stream; close it when done
+        """
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,120 @@
+"""
+JPEG Scanner Module
+Single-pass scan of JPEG marker segments shared by the EXIF and C2PA analyzers
+
+Walks the segment headers between SOI and SOS (skipping over segment bodies)
+so callers can tell up front whether the file carries EXIF (APP1) or C2PA
+JUMBF (APP11) data, and hand the EXIF parser just the APP1 segment instead
+of the whole file.
+"""
+
+import mmap
+import struct
+
+from utils.image_source import ImageSource
+
+
+SOI = b'\xff\xd8'
+EOI = b'\xff\xd9'
+APP1 = 0xFFE1
+APP11 = 0xFFEB
+SOS = 0xFFDA
+EXIF_HEADER = b'Exif\x00\x00'
+
+_SOS = 0xDA
+_EOI = 0xD9
+_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+
+def scan_segments(buf):
+    """
+    Index the metadata segments of a JPEG
+
+    Args:
+        buf: bytes, memoryview or mmap of the full file
+
+    Returns:
+        dict: {marker: [(offset, length), ...]} where offset points at the
+        0xFF marker byte and length includes the 2-byte marker. SOS is
+        recorded (length 2) only when the scan reaches the image data.
+        None if buf is not a JPEG.
+    """
+    if buf[:2] != SOI:
+        return None
+
+    segments = {}
+    offset = 2
+    size = len(buf)
+
+    while offset + 4 <= size:
+        if buf[offset] != 0xFF:
+            break  # Corrupt stream - stop at what we have
+
+        marker = buf[offset + 1]
+        if marker == 0xFF:
+            offset += 1  # Fill byte
+            continue
+        if marker in _STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker == _SOS:
+            segments[SOS] = [(offset, 2)]
+            break  # Metadata segments all precede the image data
+        if marker == _EOI:
+            break
+
+        (length,) = struct.unpack_from('>H', buf, offset + 2)
+        segments.setdefault(0xFF00 | marker, []).append((offset, length + 2))
+        offset += 2 + length
+
+    return segments
+
+
+def scan_jpeg(image_path_or_bytes):
+    """
+    Scan a JPEG once and extract what the analyzers need
+
+    Args:
+        image_path_or_bytes: File path (str), bytes or ImageSource
+
+    Returns:
+        dict: {
+            "exif": bytes or None - minimal JPEG (SOI + EXIF APP1 + EOI)
+                    that exifread can parse, None when no EXIF segment
+            "has_app11": bool - whether any APP11 (JUMBF/C2PA) segment exists
+        }
+        None if the input is not a JPEG or can't be read.
+    """
+    if isinstance(image_path_or_bytes, str):
+        try:
+            with open(image_path_or_bytes, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _layout(mm)
+        except (OSError, ValueError):
+            return None
+
+    if isinstance(image_path_or_bytes, ImageSource):
+        # Scan the shared mapping in place
+        with image_path_or_bytes.view() as buf:
+            return _layout(buf)
+
+    return _layout(image_path_or_bytes)
+
+
+def _layout(buf):
+    """Build the scan_jpeg result from an in-memory buffer"""
+    segments = scan_segments(buf)
+    if segments is None:
+        return None
+
+    exif = None
+    for offset, length in segments.get(APP1, []):
+        body_start = offset + 4
+        if buf[body_start:body_start + len(EXIF_HEADER)] == EXIF_HEADER:
+            exif = SOI + bytes(buf[offset:offset + length]) + EOI
+            break
+
+    return {
+        'exif': exif,
+        'has_app11': APP11 in segments
+    }
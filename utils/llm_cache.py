@@ -0,0 +1,403 @@
+"""
+LLM Cache Module
+Caches LLM responses so repeated triage requests skip the OpenAI round-trip
+
+Two lookup modes:
+1. Exact - SHA-256 of the canonical JSON inputs (always on)
+2. Semantic - cosine similarity over embeddings of the canonical signals
+   (opt-in via LLM_SEMANTIC_CACHE=1, used for near-duplicate analyses)
+
+Backends:
+- MemoryBackend: in-process LRU with TTL (default)
+- DiskBackend: one JSON file per entry under LLM_CACHE_DIR, survives restarts
+- RedisBackend: shared across workers when REDIS_URL is set
+
+Responses are sampled at a non-zero temperature, so a hit returns an
+earlier, equally valid answer rather than the one a fresh call would give.
+"""
+
+import os
+import json
+import glob
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from utils.llm_synthesizer import get_client
+
+
+DEFAULT_TTL = int(os.getenv('LLM_CACHE_TTL', 86400))  # 24 hours
+DEFAULT_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1024))
+# Strict by default: a near-miss on confidence-relevant fields must not hit
+SEMANTIC_THRESHOLD = float(os.getenv('LLM_SEMANTIC_THRESHOLD', 0.98))
+EMBEDDING_MODEL = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'llm')
+
+
+def canonicalize(data):
+    """
+    Serialize data to a stable JSON string
+
+    Args:
+        data: Any JSON-serializable value
+
+    Returns:
+        str: JSON with sorted keys and no insignificant whitespace
+    """
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def cache_key(namespace, payload):
+    """
+    Build an exact-match cache key
+
+    Args:
+        namespace: str - Logical cache namespace (e.g. 'analysis', 'outreach')
+        payload: JSON-serializable inputs that fully determine the response
+
+    Returns:
+        str: '<namespace>:<sha256 hex digest>'
+    """
+    digest = hashlib.sha256(canonicalize(payload).encode('utf-8')).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def _context_namespace(namespace, context):
+    """
+    Scope a namespace to the model settings that produced its responses
+
+    Args:
+        namespace: str - Cache namespace
+        context: JSON-serializable settings (model, prompt, temperature) or None
+
+    Returns:
+        str: '<namespace>' or '<namespace>:<settings digest>'
+    """
+    if context is None:
+        return namespace
+    digest = hashlib.sha256(canonicalize(context).encode('utf-8')).hexdigest()
+    return f"{namespace}:{digest[:16]}"
+
+
+def _unit(vector):
+    """Scale a vector to unit length, so cosine similarity is a dot product"""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+class MemoryBackend:
+    """
+    In-process LRU cache with per-entry TTL
+
+    Thread-safe; each gunicorn worker holds its own copy.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DiskBackend:
+    """
+    File-per-entry JSON cache with TTL
+
+    Survives restarts and is shared by workers on the same host. Expiry
+    uses the file's modification time; writes are atomic renames.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        # Keys are '<namespace>[:<digest>]:<digest>' - keep them filename-safe
+        return os.path.join(self.directory, key.replace(':', '-') + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning("LLM cache: could not write %s: %s", path, e)
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class RedisBackend:
+    """
+    Redis-backed cache shared across workers
+
+    Values are stored as JSON strings with a TTL. Like DiskBackend, an
+    unreachable server reads as a miss and skips the write.
+    """
+
+    def __init__(self, url, ttl=DEFAULT_TTL):
+        import redis
+
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self._error = redis.RedisError
+
+    def get(self, key):
+        try:
+            raw = self._client.get(key)
+        except self._error as e:
+            logging.warning("LLM cache: Redis read failed for %s: %s", key, e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        try:
+            self._client.set(key, json.dumps(value), ex=self.ttl)
+        except self._error as e:
+            logging.warning("LLM cache: Redis write failed for %s: %s", key, e)
+
+    def clear(self):
+        for key in self._client.scan_iter('analysis:*'):
+            self._client.delete(key)
+        for key in self._client.scan_iter('outreach:*'):
+            self._client.delete(key)
+
+
+class LLMCache:
+    """
+    Exact + optional semantic cache for LLM responses
+
+    Usage:
+        cache = LLMCache()
+        result = cache.get_or_compute('analysis', signals, lambda: synthesize_analysis(signals))
+    """
+
+    def __init__(self, backend=None, semantic=False, threshold=SEMANTIC_THRESHOLD):
+        self.backend = backend or MemoryBackend()
+        self.semantic = semantic
+        self.threshold = threshold
+        # Unit vectors are rows of one matrix, so a lookup is a single
+        # matrix-vector product. Rows of evicted entries are reused.
+        self._vectors = OrderedDict()  # key -> row, LRU order
+        self._matrix = None            # (max entries, dims) float32
+        self._row_keys = []            # row -> key
+        self._row_namespaces = None    # row -> namespace id, -1 when free
+        self._namespace_ids = {}
+        self._vectors_lock = threading.Lock()
+
+    def _embed(self, text):
+        """
+        Embed text with the OpenAI embeddings API
+
+        Returns:
+            list[float] or None if embedding is unavailable
+        """
+        client = get_client()
+        if client is None:
+            return None
+
+        try:
+            response = client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+            return response.data[0].embedding
+        except Exception as e:
+            logging.warning(f"LLM cache: embedding failed, skipping semantic lookup: {str(e)}")
+            return None
+
+    def _semantic_lookup(self, namespace, vector):
+        """Return the best cached value above threshold, or None"""
+        with self._vectors_lock:
+            namespace_id = self._namespace_ids.get(namespace)
+            if namespace_id is None or self._matrix is None or self._matrix.shape[1] != len(vector):
+                return None
+
+            scores = self._matrix @ vector
+            scores[self._row_namespaces != namespace_id] = -np.inf
+            row = int(np.argmax(scores))
+            if scores[row] < self.threshold:
+                return None
+            best_key = self._row_keys[row]
+
+        cached = self._backend_get(best_key)
+        with self._vectors_lock:
+            if cached is None:
+                # Expired or evicted from the backend - drop its vector too
+                self._forget_vector(best_key)
+            elif best_key in self._vectors:
+                self._vectors.move_to_end(best_key)
+        return cached
+
+    def _backend_get(self, key):
+        """Backend lookup; a failing backend reads as a miss"""
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logging.warning("LLM cache: lookup failed, treating as miss: %s", e)
+            return None
+
+    def _backend_set(self, key, value):
+        """Backend write; a failing backend just skips caching"""
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            logging.warning("LLM cache: write failed, response not cached: %s", e)
+
+    def _forget_vector(self, key):
+        """Free the row of a stored vector (caller holds _vectors_lock)"""
+        row = self._vectors.pop(key, None)
+        if row is not None:
+            self._row_namespaces[row] = -1
+
+    def _remember_vector(self, namespace, vector, key):
+        with self._vectors_lock:
+            # First vector, or the embedding model changed size: start over
+            if self._matrix is None or self._matrix.shape[1] != len(vector):
+                max_entries = getattr(self.backend, 'max_entries', DEFAULT_MAX_ENTRIES)
+                self._matrix = np.zeros((max_entries, len(vector)), dtype=np.float32)
+                self._row_namespaces = np.full(max_entries, -1, dtype=np.int32)
+                self._row_keys = [None] * max_entries
+                self._vectors.clear()
+
+            row = self._vectors.pop(key, None)
+            if row is None:
+                free = np.flatnonzero(self._row_namespaces == -1)
+                if len(free):
+                    row = int(free[0])
+                else:
+                    # Full - reuse the least recently used row
+                    _, row = self._vectors.popitem(last=False)
+
+            namespace_id = self._namespace_ids.setdefault(namespace, len(self._namespace_ids))
+            self._matrix[row] = vector
+            self._row_namespaces[row] = namespace_id
+            self._row_keys[row] = key
+            self._vectors[key] = row
+
+    def get_or_compute(self, namespace, payload, compute, semantic=None, context=None):
+        """
+        Return a cached response or compute and store a fresh one
+
+        Args:
+            namespace: str - Cache namespace
+            payload: JSON-serializable inputs used to build the key
+            compute: Zero-argument callable returning the response dict
+            semantic: bool - Override semantic lookup for this call
+            context: Model settings behind the response (see
+                llm_synthesizer.cache_context); part of the key but not
+                of the semantic embedding
+
+        Returns:
+            tuple: (dict, bool) - (response, cache_hit)
+
+        Responses carrying an 'error' key are fallbacks and never cached.
+        """
+        namespace = _context_namespace(namespace, context)
+        key = cache_key(namespace, payload)
+
+        cached = self._backend_get(key)
+        if cached is not None:
+            return cached, True
+
+        use_semantic = self.semantic if semantic is None else semantic
+        vector = None
+        if use_semantic:
+            vector = self._embed(canonicalize(payload))
+            if vector is not None:
+                vector = _unit(vector)
+            if vector is not None:
+                cached = self._semantic_lookup(namespace, vector)
+                if cached is not None:
+                    return cached, True
+
+        result = compute()
+
+        if isinstance(result, dict) and 'error' not in result:
+            self._backend_set(key, result)
+            if vector is not None:
+                self._remember_vector(namespace, vector, key)
+
+        return result, False
+
+    def clear(self):
+        """Drop all cached responses and vectors"""
+        self.backend.clear()
+        with self._vectors_lock:
+            self._vectors.clear()
+            if self._row_namespaces is not None:
+                self._row_namespaces[:] = -1
+
+
+def create_cache():
+    """
+    Build an LLMCache from environment configuration
+
+    Environment:
+        REDIS_URL: Use RedisBackend when set
+        LLM_CACHE_DIR: Otherwise use DiskBackend in this directory when set
+            (e.g. .cache/llm); MemoryBackend if neither is set
+        LLM_SEMANTIC_CACHE: '1' to enable embedding-based lookups
+
+    Returns:
+        LLMCache
+    """
+    redis_url = os.getenv('REDIS_URL')
+    backend = None
+
+    if redis_url:
+        try:
+            backend = RedisBackend(redis_url)
+        except ImportError:
+            logging.warning("LLM cache: REDIS_URL set but redis package not installed, using memory cache")
+
+    cache_dir = os.getenv('LLM_CACHE_DIR')
+    if backend is None and cache_dir:
+        backend = DiskBackend(cache_dir)
+
+    semantic = os.getenv('LLM_SEMANTIC_CACHE', '0') == '1'
+    return LLMCache(backend=backend, semantic=semantic)
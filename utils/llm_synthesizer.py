@@ -6,24 +6,395 @@ This module integrates with OpenAI's API to:
 1. Analyze provenance signals and generate confidence scores
 2. Generate rights clearance outreach messages
 
-Model: gpt-4o-mini (cost-effective, fast)
-Uses JSON mode for structured outputs
+Model: gpt-4o-mini (cost-effective, fast) by default; analysis and outreach
+can use different models (OPENAI_ANALYSIS_MODEL, OPENAI_OUTREACH_MODEL)
+Uses structured outputs (strict JSON schemas), so responses always have the
+expected shape
+
+Each call has an async variant (synthesize_analysis_async,
+generate_outreach_async) for callers that fan out many requests with
+asyncio.gather. synthesize_analysis_batched goes further and coalesces
+concurrent analyses into shared batch calls.
 """
 
 import os
+import re
 import json
-from openai import OpenAI
+import uuid
+import functools
+import threading
+import fastjsonschema
+import httpx
+import orjson
+import openai
+from openai import AsyncOpenAI, OpenAI
+
+from utils.dynamic_batcher import dynamically
+
+
+# Provider-side prompt caching (OpenAI caches byte-identical prompt prefixes).
+# When enabled, signals are serialized with sorted keys so the prompt is
+# deterministic for identical inputs, and calls share a prompt_cache_key.
+PROMPT_CACHE_ENABLED = os.getenv('OPENAI_PROMPT_CACHE', '0') == '1'
+PROMPT_CACHE_KEY = 'sourcetrace-analysis-v1'
+
+# orjson options for signal blocks embedded in prompts - compact, since
+# indentation costs input tokens without helping the model
+_SIGNALS_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+if PROMPT_CACHE_ENABLED:
+    _SIGNALS_JSON_OPTIONS |= orjson.OPT_SORT_KEYS
+
+# Sampling temperatures - lower for scoring consistency, higher for prose
+ANALYSIS_TEMPERATURE = 0.3
+OUTREACH_TEMPERATURE = 0.5
+
+# Model per task. Outreach is short prose and can run on a smaller model,
+# optionally on a self-hosted OpenAI-compatible server (OPENAI_OUTREACH_BASE_URL).
+# OPENAI_MODEL is the default for both.
+DEFAULT_MODEL = 'gpt-4o-mini'
+
+# Output token ceilings sized to the schemas (analyses run ~300 tokens).
+# Tighter reservations let the provider admit requests sooner under load.
+# LLM_MAX_OUT_TOKENS overrides both.
+ANALYSIS_MAX_TOKENS = int(os.getenv('LLM_MAX_OUT_TOKENS', 512))
+OUTREACH_MAX_TOKENS = int(os.getenv('LLM_MAX_OUT_TOKENS', 400))
+
+# Static analysis instructions - kept first in the message list so the
+# provider can cache them as a stable prefix across requests
+ANALYSIS_SYSTEM_PROMPT = """You are a media verification expert analyzing user-generated content provenance.
 
+Provide your analysis in this exact JSON format. Respond ONLY with valid JSON, no other text:
+{
+  "confidence": <0-100 integer>,
+  "summary": "<2-3 sentence plain English explanation>",
+  "red_flags": [<list of specific concerns, if any - can be empty array>],
+  "recommendation": "<proceed_to_rights|manual_review|high_risk>",
+  "reasoning": "<explanation of confidence score>",
+  "probable_owner": {
+    "username": "<if identifiable from signals, otherwise 'Unknown'>",
+    "platform": "<if identifiable, otherwise 'Unknown'>",
+    "confidence": <0-100 integer>,
+    "contact_method": "<recommended contact approach>"
+  }
+}
+
+Scoring guidance:
+- 80-100: High confidence (C2PA present OR strong EXIF + no conflicts)
+- 60-79: Medium confidence (good EXIF, some uncertainties)
+- 40-59: Low confidence (missing data OR minor conflicts)
+- 0-39: Very low confidence (significant red flags OR manipulated)
+
+Red flags to check for:
+- EXIF timestamp doesn't match claimed event timing
+- Location data conflicts with known event location
+- Evidence of editing software use after claimed capture
+- Multiple earlier versions found suggesting repost
+- No metadata at all (stripped, suggesting attempt to hide origin)
+- Reverse search shows earlier instances (likely repost)
+
+Recommendation:
+- proceed_to_rights: High confidence, ready for licensing workflow
+- manual_review: Medium confidence, human verification recommended
+- high_risk: Low confidence, likely fake or manipulated
+
+IMPORTANT: If C2PA credentials are present with identity information, extract the creator/owner details:
+- Check c2pa.identity for name, social handles, email, website
+- Use the issuer from signature_info as a signal of authenticity
+- Set high confidence (85-95) when valid C2PA with identity is present"""
+
+OUTREACH_SYSTEM_PROMPT = """Generate a professional outreach message for UGC licensing.
+
+You will receive owner information, licensing parameters, and the sender's details. Generate:
+1. A friendly but professional outreach message (150 words max)
+2. A brief license summary explaining terms in plain language
+3. Next steps for the journalist
+
+Format as JSON:
+{
+  "outreach_message": "<message text>",
+  "license_summary": "<plain language summary>",
+  "next_steps": ["<step 1>", "<step 2>", "<step 3>"]
+}
+
+Tone: Professional, respectful, clear about intent and compensation.
+The message should:
+- Include the sender's name and organization (no placeholders)
+- Address the creator respectfully
+- Clearly state intent to license content
+- Mention the use case
+- Reference compensation
+- Request written confirmation
+- Be friendly but professional"""
+
+# Single-call analysis + outreach: both instruction sets, one JSON object back
+COMBINED_SYSTEM_PROMPT = f"""You perform two tasks in one response and return a single JSON object:
+{{"analysis": <task 1 result>, "outreach": <task 2 result>}}
+
+TASK 1 - PROVENANCE ANALYSIS
+{ANALYSIS_SYSTEM_PROMPT}
+
+TASK 2 - RIGHTS OUTREACH
+{OUTREACH_SYSTEM_PROMPT}
+
+Address the outreach to the probable_owner from task 1. If the owner is 'Unknown', address the content creator generically."""
+
+# Several analyses in one call: the analysis instructions are sent once
+BATCH_ANALYSIS_SYSTEM_PROMPT = f"""You analyze several independent sets of provenance signals in one response.
+The user message holds a JSON object {{"items": [...]}}; analyze each item on its own.
+Return a single JSON object {{"results": [...]}} with exactly one analysis per item, in the same order.
+
+Each analysis follows these instructions:
+{ANALYSIS_SYSTEM_PROMPT}"""
+
+# System messages, built once and shared by every request
+_ANALYSIS_SYSTEM_MESSAGE = {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT}
+_OUTREACH_SYSTEM_MESSAGE = {"role": "system", "content": OUTREACH_SYSTEM_PROMPT}
+_COMBINED_SYSTEM_MESSAGE = {"role": "system", "content": COMBINED_SYSTEM_PROMPT}
+_BATCH_ANALYSIS_SYSTEM_MESSAGE = {"role": "system", "content": BATCH_ANALYSIS_SYSTEM_PROMPT}
+
+# User message sections shared by the analysis, outreach and combined calls
+_SIGNALS_TEMPLATE = """C2PA Credentials: {c2pa}
+EXIF Metadata: {exif}
+Reverse Image Search: {reverse_search}"""
+
+_LICENSE_TEMPLATE = """Use case: {use_case}
+Scope: {scope}
+Territory: {territory}
+Compensation: {compensation}"""
+
+# Strict structured-output schemas - the model can only sample JSON of this shape
+_ANALYSIS_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "confidence": {"type": "integer"},
+        "summary": {"type": "string"},
+        "red_flags": {"type": "array", "items": {"type": "string"}},
+        "recommendation": {"type": "string", "enum": ["proceed_to_rights", "manual_review", "high_risk"]},
+        "reasoning": {"type": "string"},
+        "probable_owner": {
+            "type": "object",
+            "properties": {
+                "username": {"type": "string"},
+                "platform": {"type": "string"},
+                "confidence": {"type": "integer"},
+                "contact_method": {"type": "string"}
+            },
+            "required": ["username", "platform", "confidence", "contact_method"],
+            "additionalProperties": False
+        }
+    },
+    "required": ["confidence", "summary", "red_flags", "recommendation", "reasoning", "probable_owner"],
+    "additionalProperties": False
+}
+
+_OUTREACH_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "outreach_message": {"type": "string"},
+        "license_summary": {"type": "string"},
+        "next_steps": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["outreach_message", "license_summary", "next_steps"],
+    "additionalProperties": False
+}
+
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "provenance_analysis", "strict": True, "schema": _ANALYSIS_JSON_SCHEMA}
+}
+
+OUTREACH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "rights_outreach", "strict": True, "schema": _OUTREACH_JSON_SCHEMA}
+}
+
+COMBINED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "analysis_and_outreach",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "analysis": _ANALYSIS_JSON_SCHEMA,
+                "outreach": _OUTREACH_JSON_SCHEMA
+            },
+            "required": ["analysis", "outreach"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+# Process-wide OpenAI clients - reuse pooled keep-alive connections across calls
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60)
+
+
+def init_clients():
+    """
+    Create the shared OpenAI client
+
+    Called once at app startup; safe to call again (no-op once created).
+    Skipped while the API key is missing so the fallback paths still work.
+
+    Returns:
+        OpenAI or None if the API key is not configured
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None and _check_api_key()[0]:
+            _client = OpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                http_client=httpx.Client(limits=_HTTP_LIMITS)
+            )
+        return _client
+
+
+def get_client():
+    """
+    Get the shared OpenAI client, creating it on first use
+
+    Returns:
+        OpenAI or None if the API key is not configured
+    """
+    return _client or init_clients()
+
+
+def get_async_client():
+    """
+    Get the shared AsyncOpenAI client, creating it on first use
+
+    The client's connection pool belongs to the event loop that first uses
+    it, so share it within one long-lived loop rather than across
+    asyncio.run() calls.
+
+    Returns:
+        AsyncOpenAI or None if the API key is not configured
+    """
+    global _async_client
+
+    if _async_client is not None:
+        return _async_client
+
+    with _client_lock:
+        if _async_client is None and _check_api_key()[0]:
+            _async_client = AsyncOpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                http_client=httpx.AsyncClient(limits=_HTTP_LIMITS)
+            )
+        return _async_client
+
+
+def _client_for(api_key):
+    """
+    Get the client to use for a call
+
+    Args:
+        api_key: str or None - Explicit key; None uses the shared client
 
-def _check_api_key():
+    Returns:
+        OpenAI client
+    """
+    if api_key is None:
+        return get_client()
+    return _keyed_client(api_key)
+
+
+def _async_client_for(api_key):
+    """
+    Get the async client to use for a call
+
+    Args:
+        api_key: str or None - Explicit key; None uses the shared client
+
+    Returns:
+        AsyncOpenAI client
+    """
+    if api_key is None:
+        return get_async_client()
+    return _keyed_async_client(api_key)
+
+
+@functools.lru_cache(maxsize=8)
+def _keyed_client(api_key, base_url=None):
+    """Pooled OpenAI client for an explicit key (and endpoint), reused across calls"""
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=httpx.Client(limits=_HTTP_LIMITS))
+
+
+@functools.lru_cache(maxsize=8)
+def _keyed_async_client(api_key, base_url=None):
+    """Pooled AsyncOpenAI client for an explicit key (and endpoint), reused across calls"""
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=httpx.AsyncClient(limits=_HTTP_LIMITS))
+
+
+def _analysis_model():
+    """Model for provenance analysis (OPENAI_ANALYSIS_MODEL)"""
+    return os.getenv('OPENAI_ANALYSIS_MODEL') or os.getenv('OPENAI_MODEL', DEFAULT_MODEL)
+
+
+def _outreach_model():
+    """Model for outreach drafting (OPENAI_OUTREACH_MODEL)"""
+    return os.getenv('OPENAI_OUTREACH_MODEL') or os.getenv('OPENAI_MODEL', DEFAULT_MODEL)
+
+
+def _outreach_client_for(api_key, asynchronous=False):
+    """
+    Get the client to use for an outreach call
+
+    Same as _client_for / _async_client_for unless OPENAI_OUTREACH_BASE_URL
+    points outreach at another OpenAI-compatible endpoint.
+
+    Args:
+        api_key: str or None - Explicit key; None reads OPENAI_API_KEY
+        asynchronous: bool - Return an AsyncOpenAI client
+
+    Returns:
+        OpenAI or AsyncOpenAI client
+    """
+    base_url = os.getenv('OPENAI_OUTREACH_BASE_URL')
+    if not base_url:
+        return _async_client_for(api_key) if asynchronous else _client_for(api_key)
+
+    if api_key is None:
+        api_key = os.getenv('OPENAI_API_KEY')
+    if asynchronous:
+        return _keyed_async_client(api_key, base_url)
+    return _keyed_client(api_key, base_url)
+
+
+def _check_api_key(api_key=None):
     """
     Check if OpenAI API key is configured
 
+    Args:
+        api_key: str or None - Key to check; None reads OPENAI_API_KEY
+
     Returns:
         tuple: (bool, str) - (is_valid, message)
     """
-    api_key = os.getenv('OPENAI_API_KEY')
+    if api_key is None:
+        api_key = os.getenv('OPENAI_API_KEY')
+
+    # Memoized on the key value, so a changed OPENAI_API_KEY is re-checked
+    return _validate_api_key(api_key)
+
+
+@functools.lru_cache(maxsize=8)
+def _validate_api_key(api_key):
+    """
+    Validate an API key value (cached per distinct key)
+
+    Args:
+        api_key: str or None - Key to validate
 
+    Returns:
+        tuple: (bool, str) - (is_valid, message)
+    """
     if not api_key:
         return False, "OPENAI_API_KEY not found in environment variables"
 
@@ -33,251 +404,905 @@ def _check_api_key():
     if len(api_key) < 20:
         return False, "OPENAI_API_KEY appears invalid (too short)"
 
-    return True, "API key configured"
+    return True, "API key configured"
+
+
+BATCH_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "analysis_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {"type": "array", "items": _ANALYSIS_JSON_SCHEMA}
+            },
+            "required": ["results"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+# Response contracts for the fallback checks, compiled once by fastjsonschema.
+# Model responses are shaped by the strict structured-output schemas instead.
+_ANALYSIS_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'required': ['confidence', 'summary', 'recommendation'],
+    'properties': {
+        'confidence': {'type': 'number', 'minimum': 0, 'maximum': 100},
+        'recommendation': {'enum': ['proceed_to_rights', 'manual_review', 'high_risk']}
+    }
+}
+
+_OUTREACH_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'required': ['outreach_message', 'license_summary', 'next_steps'],
+    'properties': {
+        'next_steps': {'type': 'array'}
+    }
+}
+
+# Fallbacks are valid responses that also route to manual review and carry 'error'
+_FALLBACK_ANALYSIS_SCHEMA = {
+    'allOf': [
+        _ANALYSIS_RESPONSE_SCHEMA,
+        {'required': ['error'], 'properties': {'recommendation': {'const': 'manual_review'}}}
+    ]
+}
+
+_FALLBACK_OUTREACH_SCHEMA = {
+    'allOf': [_OUTREACH_RESPONSE_SCHEMA, {'required': ['error']}]
+}
+
+_validate_fallback_analysis_schema = fastjsonschema.compile(_FALLBACK_ANALYSIS_SCHEMA)
+_validate_fallback_outreach_schema = fastjsonschema.compile(_FALLBACK_OUTREACH_SCHEMA)
+
+
+def _validate_analysis_response(data):
+    """
+    Check the one constraint strict structured outputs can't express
+
+    The schema fixes the shape and types of an analysis but not the 0-100
+    range of its confidence score.
+
+    Args:
+        data: dict from LLM response
+
+    Returns:
+        tuple: (bool, str) - (is_valid, message)
+    """
+    confidence = data.get('confidence')
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+        return False, "confidence must be a number"
+    if not 0 <= confidence <= 100:
+        return False, f"confidence {confidence} is outside 0-100"
+
+    return True, "Valid"
+
+
+def _validate_fallback_analysis(data):
+    """
+    Check that an analysis is a well-formed fallback response
+
+    Args:
+        data: dict returned by synthesize_analysis
+
+    Returns:
+        tuple: (bool, str) - (is_valid, message)
+    """
+    try:
+        _validate_fallback_analysis_schema(data)
+    except fastjsonschema.JsonSchemaException as e:
+        return False, e.message
+
+    return True, "Valid"
+
+
+def _validate_fallback_outreach(data):
+    """
+    Check that an outreach result is a well-formed fallback response
+
+    Args:
+        data: dict returned by generate_outreach
+
+    Returns:
+        tuple: (bool, str) - (is_valid, message)
+    """
+    try:
+        _validate_fallback_outreach_schema(data)
+    except fastjsonschema.JsonSchemaException as e:
+        return False, e.message
+
+    return True, "Valid"
+
+
+# Owner placeholder for fallback and rule-decided analyses - copied per response, since
+# callers may fill it in
+_UNKNOWN_OWNER = {
+    'username': 'Unknown',
+    'platform': 'Unknown',
+    'confidence': 0,
+    'contact_method': 'Manual investigation required'
+}
+
+# Typed OpenAI errors -> user-facing message; checked in order, so the
+# timeout subclass of APIConnectionError is listed on its own
+_API_ERROR_MESSAGES = (
+    (openai.AuthenticationError, 'OpenAI API authentication failed - check API key'),
+    (openai.RateLimitError, 'OpenAI API rate limit exceeded - try again later'),
+    (openai.APITimeoutError, 'OpenAI API request timed out')
+)
+
+
+def _fallback_analysis(summary, red_flag, reasoning, error):
+    """
+    Build the manual-review analysis returned when the LLM is unavailable
+
+    Args:
+        summary: str - User-facing summary
+        red_flag: str - Single red flag describing the failure
+        reasoning: str - Why no automated score was produced
+        error: str - Error message for the 'error' key
+
+    Returns:
+        dict: Analysis-shaped fallback response
+    """
+    return {
+        'confidence': 50,
+        'summary': summary,
+        'red_flags': [red_flag],
+        'recommendation': 'manual_review',
+        'reasoning': reasoning,
+        'probable_owner': dict(_UNKNOWN_OWNER),
+        'error': error
+    }
+
+
+def _fallback_outreach(owner_info, license_params, error):
+    """
+    Build a template outreach message when the LLM call fails
+
+    Args:
+        owner_info: dict with username, platform
+        license_params: dict with use_case, territory, compensation
+        error: str - Error message for the 'error' key
+
+    Returns:
+        dict: Outreach-shaped fallback response
+    """
+    username = owner_info.get('username', 'content creator')
+    platform = owner_info.get('platform', 'platform')
+    use_case = license_params.get('use_case', 'content usage')
+    compensation = license_params.get('compensation', 'negotiable')
+
+    return {
+        'outreach_message': f"Hi {username}, We'd like to use your content for {use_case}. Compensation: {compensation}. Please contact us to discuss licensing.",
+        'license_summary': f"Standard licensing for {use_case}. Territory: {license_params.get('territory', 'worldwide')}.",
+        'next_steps': [
+            f"Contact {username} via {platform}",
+            "Discuss and negotiate terms",
+            "Obtain written permission"
+        ],
+        'error': error
+    }
+
+
+def _describe_api_error(e):
+    """
+    Map an OpenAI exception to a short user-facing message
+
+    Args:
+        e: Exception raised by the OpenAI client (or while parsing its response)
+
+    Returns:
+        str: Error message
+    """
+    for error_type, message in _API_ERROR_MESSAGES:
+        if isinstance(e, error_type):
+            return message
+
+    return f'OpenAI API error: {str(e)[:100]}'
+
+
+def _completion_content(response):
+    """
+    Text of a chat completion's first choice
+
+    Raises:
+        ValueError: If the model refused instead of answering
+    """
+    message = response.choices[0].message
+    if message.content is None:
+        raise ValueError(f"LLM refused the request: {getattr(message, 'refusal', None)}")
+    return message.content
+
+
+_EMPTY_VALUES = (None, '', [], {})
+
+
+def _prune_empty(value):
+    """
+    Drop keys whose values are None or empty, at every dict level
+
+    List items are kept (only pruned inside) so positions stay meaningful.
+    """
+    if isinstance(value, dict):
+        pruned = {}
+        for k, v in value.items():
+            v = _prune_empty(v)
+            if v not in _EMPTY_VALUES:
+                pruned[k] = v
+        return pruned
+    if isinstance(value, list):
+        return [_prune_empty(v) for v in value]
+    return value
+
+
+def _signals_json(value):
+    """
+    Serialize one signal block for a prompt
+
+    Args:
+        value: dict - c2pa, exif or reverse_search signals
+
+    Returns:
+        str: Compact JSON without empty fields (keys sorted when prompt
+        caching is enabled)
+    """
+    return orjson.dumps(_prune_empty(value), option=_SIGNALS_JSON_OPTIONS).decode()
+
+
+def _signals_section(signals):
+    """User message section listing the three signal blocks"""
+    return _SIGNALS_TEMPLATE.format(
+        c2pa=_signals_json(signals.get('c2pa', {})),
+        exif=_signals_json(signals.get('exif', {})),
+        reverse_search=_signals_json(signals.get('reverse_search', {}))
+    )
+
+
+def _license_section(license_params):
+    """User message section listing the license terms"""
+    return _LICENSE_TEMPLATE.format(
+        use_case=license_params.get('use_case', 'content usage'),
+        scope=license_params.get('scope', 'single use'),
+        territory=license_params.get('territory', 'worldwide'),
+        compensation=license_params.get('compensation', 'standard rate')
+    )
+
+
+def _build_analysis_messages(signals):
+    """
+    Build chat messages for provenance analysis
+
+    The static system prompt always comes first and the per-request signals
+    last, so the prompt prefix is byte-identical across calls.
+
+    Args:
+        signals: dict with c2pa, exif, reverse_search data
+
+    Returns:
+        list: OpenAI chat messages
+    """
+    user_message = f"""Analyze these provenance signals:
+
+{_signals_section(signals)}
+
+Provide your analysis as JSON."""
+
+    return [
+        _ANALYSIS_SYSTEM_MESSAGE,
+        {"role": "user", "content": user_message}
+    ]
+
+
+def cache_context(kind):
+    """
+    Model settings that shape a response besides its inputs
+
+    Mixed into LLM cache keys so that changing the model, prompt or
+    temperature doesn't serve answers produced under the old settings.
+
+    Args:
+        kind: str - 'analysis' or 'outreach'
+
+    Returns:
+        dict: Model, system prompt and temperature for that call
+    """
+    if kind == 'analysis':
+        model, system_prompt, temperature = _analysis_model(), ANALYSIS_SYSTEM_PROMPT, ANALYSIS_TEMPERATURE
+    else:
+        model, system_prompt, temperature = _outreach_model(), OUTREACH_SYSTEM_PROMPT, OUTREACH_TEMPERATURE
+
+    return {
+        'model': model,
+        'system': system_prompt,
+        'temperature': temperature
+    }
+
+
+def _analysis_request(signals):
+    """
+    Build the chat completion arguments for provenance analysis
+
+    Args:
+        signals: dict with c2pa, exif, reverse_search data
+
+    Returns:
+        dict: Keyword arguments for chat.completions.create
+    """
+    request = {
+        'model': _analysis_model(),
+        # Static system prompt first, dynamic signals last
+        'messages': _build_analysis_messages(signals),
+        'response_format': ANALYSIS_RESPONSE_FORMAT,
+        'temperature': ANALYSIS_TEMPERATURE,
+        'max_tokens': ANALYSIS_MAX_TOKENS,
+        'timeout': 30.0
+    }
+
+    # Opt-in prompt cache routing hint
+    if PROMPT_CACHE_ENABLED:
+        request['prompt_cache_key'] = PROMPT_CACHE_KEY
+
+    return request
+
+
+def _analysis_from_response(response):
+    """
+    Parse and validate an analysis completion
+
+    Args:
+        response: ChatCompletion from the analysis request
+
+    Returns:
+        dict: Normalized analysis
+
+    Raises:
+        json.JSONDecodeError: If the model didn't return JSON
+        ValueError: If the JSON doesn't match the analysis contract
+    """
+    return _analysis_from_content(_completion_content(response))
+
+
+def _analysis_from_content(content):
+    """Parse and validate analysis JSON text (see _analysis_from_response)"""
+    result = json.loads(content)
+
+    valid, validation_message = _validate_analysis_response(result)
+    if not valid:
+        raise ValueError(f"Invalid LLM response: {validation_message}")
+
+    return result
+
+
+# Top-level analysis fields that can be shown before the response completes.
+# Only the text before "probable_owner" is searched, so its nested
+# confidence isn't mistaken for the overall score.
+_PARTIAL_FIELD_PATTERNS = {
+    'confidence': re.compile(r'"confidence"\s*:\s*(\d+)\s*[,}\s]'),
+    'recommendation': re.compile(r'"recommendation"\s*:\s*"(proceed_to_rights|manual_review|high_risk)"')
+}
+
+
+def _scan_partial_analysis(text, partial):
+    """
+    Pick completed top-level fields out of a partial analysis JSON
+
+    Args:
+        text: str - Response text received so far
+        partial: dict - Fields found so far, updated in place
+
+    Returns:
+        bool: Whether a new field was found
+    """
+    owner_at = text.find('"probable_owner"')
+    if owner_at != -1:
+        text = text[:owner_at]
+
+    found = False
+    for name, pattern in _PARTIAL_FIELD_PATTERNS.items():
+        if name not in partial:
+            match = pattern.search(text)
+            if match:
+                value = match.group(1)
+                partial[name] = int(value) if name == 'confidence' else value
+                found = True
+    return found
+
+
+def _stream_analysis(client, request, on_partial):
+    """
+    Stream an analysis completion, reporting early fields as they arrive
+
+    Args:
+        client: OpenAI client
+        request: dict - Arguments from _analysis_request
+        on_partial: callable(dict) - Called with the fields decoded so far
+            (confidence, recommendation) each time one completes
+
+    Returns:
+        dict: Normalized analysis, parsed once the stream ends
+    """
+    chunks = []
+    text = ''
+    partial = {}
+
+    for chunk in client.chat.completions.create(**request, stream=True):
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+
+        chunks.append(delta)
+        if len(partial) < len(_PARTIAL_FIELD_PATTERNS):
+            text += delta
+            if _scan_partial_analysis(text, partial):
+                on_partial(dict(partial))
+
+    return _analysis_from_content(''.join(chunks))
+
+
+def _analysis_without_key(key_message):
+    """Fallback analysis when no usable API key is configured"""
+    return _fallback_analysis(
+        'Unable to perform automated analysis. Manual review required.',
+        'LLM analysis unavailable: ' + key_message,
+        'OpenAI API key not configured',
+        key_message
+    )
+
+
+def _analysis_after_error(e):
+    """
+    Fallback analysis for a failed request
+
+    Args:
+        e: Exception raised while calling the API or parsing its response
+
+    Returns:
+        dict: Analysis-shaped fallback response
+    """
+    if isinstance(e, json.JSONDecodeError):
+        return _fallback_analysis(
+            'Error parsing analysis results. Manual review required.',
+            f'JSON parsing error: {str(e)}',
+            'LLM returned invalid JSON format',
+            f'JSON parsing failed: {str(e)}'
+        )
+
+    message = _describe_api_error(e)
+    return _fallback_analysis(
+        'Unable to complete automated analysis. Manual review required.',
+        message,
+        'LLM analysis failed due to API error',
+        message
+    )
+
+
+# Reverse search matches that, with no metadata at all, mark a likely repost
+REPOST_MATCH_COUNT = 3
+
+
+def rules_analysis(signals):
+    """
+    Decide the analysis without the LLM when signals are already conclusive
+
+    Applies the scoring guidance of the analysis prompt to the cases it
+    settles outright, so those never cost a round-trip. Everything in the
+    uncertain middle is left to the model.
+
+    Args:
+        signals: dict with c2pa, exif, reverse_search data
+
+    Returns:
+        dict: Analysis in the synthesize_analysis format, or None when the
+        LLM is needed
+    """
+    c2pa_data = signals.get('c2pa') or {}
+    exif_data = signals.get('exif') or {}
+    reverse_search_data = signals.get('reverse_search') or {}
+
+    # Valid signed C2PA manifest - provenance is cryptographically proven
+    if c2pa_data.get('present') and c2pa_data.get('valid') and c2pa_data.get('signature_info'):
+        issuer = c2pa_data['signature_info'].get('issuer', 'Unknown')
+        identity = c2pa_data.get('identity')
+        owner_name = None
+        if isinstance(identity, dict):
+            owner_name = identity.get('name') or identity.get('username')
+
+        return {
+            'confidence': 95,
+            'summary': f'Valid C2PA Content Credentials signed by {issuer}. Provenance is cryptographically verified.',
+            'red_flags': [],
+            'recommendation': 'proceed_to_rights',
+            'reasoning': 'c2pa_direct: signed manifest validated without errors',
+            'probable_owner': {
+                'username': owner_name or 'Unknown',
+                'platform': 'C2PA Content Credentials' if owner_name else 'Unknown',
+                'confidence': 90 if owner_name else 0,
+                'contact_method': 'Use identity details from Content Credentials' if owner_name else 'Manual investigation required'
+            }
+        }
+
+    # No metadata at all and the image is already widely posted - likely a repost
+    match_count = reverse_search_data.get('match_count') or 0
+    if (match_count >= REPOST_MATCH_COUNT and not exif_data.get('has_exif')
+            and not c2pa_data.get('present')):
+        return {
+            'confidence': 25,
+            'summary': f'No metadata, and reverse search found {match_count} earlier instances. Likely a repost rather than the original.',
+            'red_flags': [
+                'No metadata at all (stripped, suggesting attempt to hide origin)',
+                f'Reverse search shows {match_count} earlier instances (likely repost)'
+            ],
+            'recommendation': 'high_risk',
+            'reasoning': 'repost_direct: stripped metadata and multiple earlier copies online',
+            'probable_owner': dict(_UNKNOWN_OWNER)
+        }
+
+    return None
+
+
+def synthesize_analysis(signals, *, api_key=None, on_partial=None, apply_rules=True):
+    """
+    Synthesize provenance signals into confidence score using OpenAI
+
+    Args:
+        signals: dict with c2pa, exif, reverse_search data
+            Example:
+            {
+                "c2pa": {"present": False, "message": "..."},
+                "exif": {"camera_make": "Apple", ...},
+                "reverse_search": {"found": True, "match_count": 5, ...}
+            }
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+            ("" forces the fallback response without touching os.environ)
+        on_partial: callable(dict) or None - Stream the response and call
+            this with {"confidence": ..., "recommendation": ...} as each
+            field arrives, before the full analysis is returned
+        apply_rules: bool - False when the caller has already run
+            rules_analysis on these signals
+
+    Returns:
+        dict: Confidence score, summary, recommendations
+            Example:
+            {
+                "confidence": 85,
+                "summary": "High confidence in authenticity...",
+                "red_flags": [],
+                "recommendation": "proceed_to_rights",
+                "reasoning": "Strong EXIF metadata...",
+                "probable_owner": {
+                    "username": "@user123",
+                    "platform": "Twitter/X",
+                    "confidence": 68,
+                    "contact_method": "DM on X"
+                }
+            }
+
+    Model: OPENAI_ANALYSIS_MODEL (default gpt-4o-mini)
+    Uses structured outputs (response_format=ANALYSIS_RESPONSE_FORMAT)
+    Temperature: 0.3 (lower for consistency)
+    Conclusive signals are decided by rules_analysis without calling the model
+    """
+    # Conclusive cases need no LLM call
+    decided = rules_analysis(signals) if apply_rules else None
+    if decided is not None:
+        return decided
+
+    # Check API key
+    key_valid, key_message = _check_api_key(api_key)
+    if not key_valid:
+        return _analysis_without_key(key_message)
+
+    try:
+        # Shared OpenAI client
+        client = _client_for(api_key)
+        if on_partial is not None:
+            return _stream_analysis(client, _analysis_request(signals), on_partial)
+
+        response = client.chat.completions.create(**_analysis_request(signals))
+        return _analysis_from_response(response)
+
+    except Exception as e:
+        return _analysis_after_error(e)
+
+
+async def synthesize_analysis_async(signals, *, api_key=None):
+    """
+    Async variant of synthesize_analysis
+
+    Awaits the shared AsyncOpenAI client instead of blocking, so many
+    analyses can be in flight at once:
+
+        results = await asyncio.gather(*(synthesize_analysis_async(s) for s in signals_list))
+
+    Args:
+        signals: dict with c2pa, exif, reverse_search data
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+
+    Returns:
+        dict: Same structure as synthesize_analysis
+    """
+    decided = rules_analysis(signals)
+    if decided is not None:
+        return decided
+
+    key_valid, key_message = _check_api_key(api_key)
+    if not key_valid:
+        return _analysis_without_key(key_message)
+
+    try:
+        client = _async_client_for(api_key)
+        response = await client.chat.completions.create(**_analysis_request(signals))
+        return _analysis_from_response(response)
+
+    except Exception as e:
+        return _analysis_after_error(e)
+
+
+def _analysis_batch_request(signals_list):
+    """
+    Build the chat completion arguments for a batch of analyses
+
+    Args:
+        signals_list: list of signals dicts (c2pa, exif, reverse_search)
+
+    Returns:
+        dict: Keyword arguments for chat.completions.create
+    """
+    items = [
+        {
+            'c2pa': signals.get('c2pa', {}),
+            'exif': signals.get('exif', {}),
+            'reverse_search': signals.get('reverse_search', {})
+        }
+        for signals in signals_list
+    ]
+    user_message = (
+        f"Analyze these {len(items)} provenance signal sets:\n"
+        + _signals_json({'items': items})
+    )
+
+    return {
+        'model': _analysis_model(),
+        'messages': [
+            _BATCH_ANALYSIS_SYSTEM_MESSAGE,
+            {"role": "user", "content": user_message}
+        ],
+        'response_format': BATCH_ANALYSIS_RESPONSE_FORMAT,
+        'temperature': ANALYSIS_TEMPERATURE,
+        'max_tokens': ANALYSIS_MAX_TOKENS * len(items),
+        'timeout': 30.0 + 10.0 * len(items)
+    }
+
+
+def _analysis_batch_from_response(response, count):
+    """
+    Split a batch completion into per-item analyses
+
+    Items that fail validation get a fallback analysis of their own, so one
+    bad entry doesn't discard the rest of the batch.
+
+    Args:
+        response: ChatCompletion from the batch request
+        count: int - Number of signal sets sent
+
+    Returns:
+        list: count analyses, in request order
+
+    Raises:
+        json.JSONDecodeError: If the model didn't return JSON
+        ValueError: If the number of results doesn't match the request
+    """
+    results = json.loads(_completion_content(response)).get('results')
+    if not isinstance(results, list) or len(results) != count:
+        raise ValueError(f"Invalid LLM response: expected {count} results")
+
+    analyses = []
+    for result in results:
+        valid, validation_message = _validate_analysis_response(result)
+        if valid:
+            analyses.append(result)
+        else:
+            analyses.append(_analysis_after_error(ValueError(f"Invalid LLM response: {validation_message}")))
+    return analyses
+
+
+def synthesize_analysis_batch(signals_list, *, api_key=None):
+    """
+    Analyze several signal sets in a single OpenAI call
+
+    The analysis instructions are sent once for the whole batch instead of
+    once per image, and all items share one round-trip.
+
+    Args:
+        signals_list: list of signals dicts (see synthesize_analysis)
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+
+    Returns:
+        list: One synthesize_analysis-shaped dict per signal set, in order
+
+    Model: OPENAI_ANALYSIS_MODEL (default gpt-4o-mini)
+    Uses structured outputs (response_format={"type": "json_schema", ...})
+    Temperature: 0.3
+    """
+    # Only signal sets the rules can't decide go to the model
+    decided = [rules_analysis(signals) for signals in signals_list]
+    if any(analysis is not None for analysis in decided):
+        pending = [signals for signals, analysis in zip(signals_list, decided) if analysis is None]
+        analyses = iter(synthesize_analysis_batch(pending, api_key=api_key))
+        return [analysis or next(analyses) for analysis in decided]
+
+    if len(signals_list) <= 1:
+        return [synthesize_analysis(signals, api_key=api_key) for signals in signals_list]
+
+    key_valid, key_message = _check_api_key(api_key)
+    if not key_valid:
+        return [_analysis_without_key(key_message) for _ in signals_list]
+
+    try:
+        client = _client_for(api_key)
+        response = client.chat.completions.create(**_analysis_batch_request(signals_list))
+        return _analysis_batch_from_response(response, len(signals_list))
+
+    except Exception as e:
+        return [_analysis_after_error(e) for _ in signals_list]
 
 
-def _validate_analysis_response(data):
+async def synthesize_analysis_batch_async(signals_list, *, api_key=None):
     """
-    Validate LLM analysis response structure
+    Async variant of synthesize_analysis_batch
 
     Args:
-        data: dict from LLM response
+        signals_list: list of signals dicts (see synthesize_analysis)
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
 
     Returns:
-        tuple: (bool, str) - (is_valid, message)
+        list: One synthesize_analysis-shaped dict per signal set, in order
     """
-    required_fields = ['confidence', 'summary', 'recommendation']
+    decided = [rules_analysis(signals) for signals in signals_list]
+    if any(analysis is not None for analysis in decided):
+        pending = [signals for signals, analysis in zip(signals_list, decided) if analysis is None]
+        analyses = iter(await synthesize_analysis_batch_async(pending, api_key=api_key))
+        return [analysis or next(analyses) for analysis in decided]
 
-    # Check required fields
-    for field in required_fields:
-        if field not in data:
-            return False, f"Missing required field: {field}"
+    if len(signals_list) <= 1:
+        return [await synthesize_analysis_async(signals, api_key=api_key) for signals in signals_list]
 
-    # Validate confidence range
-    confidence = data.get('confidence')
-    if not isinstance(confidence, (int, float)) or not (0 <= confidence <= 100):
-        return False, f"Confidence must be integer 0-100, got: {confidence}"
+    key_valid, key_message = _check_api_key(api_key)
+    if not key_valid:
+        return [_analysis_without_key(key_message) for _ in signals_list]
 
-    # Validate recommendation enum
-    valid_recs = ['proceed_to_rights', 'manual_review', 'high_risk']
-    if data.get('recommendation') not in valid_recs:
-        return False, f"Invalid recommendation '{data.get('recommendation')}'. Must be one of: {valid_recs}"
+    try:
+        client = _async_client_for(api_key)
+        response = await client.chat.completions.create(**_analysis_batch_request(signals_list))
+        return _analysis_batch_from_response(response, len(signals_list))
 
-    return True, "Valid"
+    except Exception as e:
+        return [_analysis_after_error(e) for _ in signals_list]
 
 
-def _validate_outreach_response(data):
+@dynamically(max_batch_size=16, timeout_ms=50)
+async def synthesize_analysis_batched(signals_list):
     """
-    Validate outreach generation response structure
+    Analyze one signal set, sharing an OpenAI call with concurrent callers
 
-    Args:
-        data: dict from LLM response
+    Awaited with a single signals dict; calls made within 50 ms of each
+    other (up to 16) are sent as one synthesize_analysis_batch_async call.
+    Uses the OPENAI_API_KEY client.
 
     Returns:
-        tuple: (bool, str) - (is_valid, message)
+        dict: Same structure as synthesize_analysis
     """
-    required_fields = ['outreach_message', 'license_summary', 'next_steps']
-
-    # Check required fields
-    for field in required_fields:
-        if field not in data:
-            return False, f"Missing required field: {field}"
-
-    # Validate next_steps is a list
-    if not isinstance(data.get('next_steps'), list):
-        return False, "next_steps must be a list"
-
-    return True, "Valid"
+    return await synthesize_analysis_batch_async(signals_list)
 
 
-def synthesize_analysis(signals):
+def _outreach_request(owner_info, license_params, your_name, your_organization):
     """
-    Synthesize provenance signals into confidence score using OpenAI
+    Build the chat completion arguments for outreach generation
 
     Args:
-        signals: dict with c2pa, exif, reverse_search data
-            Example:
-            {
-                "c2pa": {"present": False, "message": "..."},
-                "exif": {"camera_make": "Apple", ...},
-                "reverse_search": {"found": True, "match_count": 5, ...}
-            }
+        owner_info: dict with username, platform
+        license_params: dict with use_case, scope, territory, compensation
+        your_name: str - Name of person sending the message
+        your_organization: str - Organization name
 
     Returns:
-        dict: Confidence score, summary, recommendations
-            Example:
-            {
-                "confidence": 85,
-                "summary": "High confidence in authenticity...",
-                "red_flags": [],
-                "recommendation": "proceed_to_rights",
-                "reasoning": "Strong EXIF metadata...",
-                "probable_owner": {
-                    "username": "@user123",
-                    "platform": "Twitter/X",
-                    "confidence": 68,
-                    "contact_method": "DM on X"
-                }
-            }
-
-    Model: gpt-4o-mini
-    Uses JSON mode for structured outputs (response_format={"type": "json_object"})
-    Temperature: 0.3 (lower for consistency)
+        dict: Keyword arguments for chat.completions.create
     """
-    # Check API key
-    key_valid, key_message = _check_api_key()
-    if not key_valid:
-        return {
-            'confidence': 50,
-            'summary': 'Unable to perform automated analysis. Manual review required.',
-            'red_flags': ['LLM analysis unavailable: ' + key_message],
-            'recommendation': 'manual_review',
-            'reasoning': 'OpenAI API key not configured',
-            'probable_owner': {
-                'username': 'Unknown',
-                'platform': 'Unknown',
-                'confidence': 0,
-                'contact_method': 'Manual investigation required'
-            },
-            'error': key_message
-        }
-
-    try:
-        # Initialize OpenAI client
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    user_message = f"""Sender: {your_name} from {your_organization}
+Owner: {owner_info.get('username', 'content creator')} on {owner_info.get('platform', 'platform')}
+{_license_section(license_params)}
 
-        # Build system message
-        system_message = """You are a media verification expert analyzing user-generated content provenance.
+Generate the outreach message and license summary."""
 
-Provide your analysis in this exact JSON format. Respond ONLY with valid JSON, no other text:
-{
-  "confidence": <0-100 integer>,
-  "summary": "<2-3 sentence plain English explanation>",
-  "red_flags": [<list of specific concerns, if any - can be empty array>],
-  "recommendation": "<proceed_to_rights|manual_review|high_risk>",
-  "reasoning": "<explanation of confidence score>",
-  "probable_owner": {
-    "username": "<if identifiable from signals, otherwise 'Unknown'>",
-    "platform": "<if identifiable, otherwise 'Unknown'>",
-    "confidence": <0-100 integer>,
-    "contact_method": "<recommended contact approach>"
-  }
-}
+    return {
+        'model': _outreach_model(),
+        'messages': [
+            _OUTREACH_SYSTEM_MESSAGE,
+            {"role": "user", "content": user_message}
+        ],
+        'response_format': OUTREACH_RESPONSE_FORMAT,
+        'temperature': OUTREACH_TEMPERATURE,  # Higher for natural language
+        'max_tokens': OUTREACH_MAX_TOKENS,
+        'timeout': 30.0
+    }
 
-Scoring guidance:
-- 80-100: High confidence (C2PA present OR strong EXIF + no conflicts)
-- 60-79: Medium confidence (good EXIF, some uncertainties)
-- 40-59: Low confidence (missing data OR minor conflicts)
-- 0-39: Very low confidence (significant red flags OR manipulated)
 
-Red flags to check for:
-- EXIF timestamp doesn't match claimed event timing
-- Location data conflicts with known event location
-- Evidence of editing software use after claimed capture
-- Multiple earlier versions found suggesting repost
-- No metadata at all (stripped, suggesting attempt to hide origin)
-- Reverse search shows earlier instances (likely repost)
+def _outreach_from_response(response):
+    """
+    Parse an outreach completion
 
-Recommendation:
-- proceed_to_rights: High confidence, ready for licensing workflow
-- manual_review: Medium confidence, human verification recommended
-- high_risk: Low confidence, likely fake or manipulated
+    Args:
+        response: ChatCompletion from the outreach request
 
-IMPORTANT: If C2PA credentials are present with identity information, extract the creator/owner details:
-- Check c2pa.identity for name, social handles, email, website
-- Use the issuer from signature_info as a signal of authenticity
-- Set high confidence (85-95) when valid C2PA with identity is present"""
+    Returns:
+        dict: Outreach message, license summary and next steps
 
-        # Build user message with signals
-        user_message = f"""Analyze these provenance signals:
+    Raises:
+        json.JSONDecodeError: If the model didn't return JSON
+        ValueError: If the model refused the request
+    """
+    return _outreach_from_content(_completion_content(response))
 
-C2PA Credentials: {json.dumps(signals.get('c2pa', {}), indent=2)}
-EXIF Metadata: {json.dumps(signals.get('exif', {}), indent=2)}
-Reverse Image Search: {json.dumps(signals.get('reverse_search', {}), indent=2)}
 
-Provide your analysis as JSON."""
+def _outreach_from_content(content):
+    """Parse outreach JSON text (see _outreach_from_response)"""
+    return json.loads(content)
 
-        # Call OpenAI API
-        response = client.chat.completions.create(
-            model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.3,
-            max_tokens=1024,
-            timeout=30.0
-        )
 
-        # Parse response
-        result_text = response.choices[0].message.content
-        result = json.loads(result_text)
+def _outreach_without_key(owner_info, license_params, your_name, your_organization, key_message):
+    """Template outreach when no usable API key is configured"""
+    username = owner_info.get('username', 'content creator')
+    platform = owner_info.get('platform', 'platform')
+    use_case = license_params.get('use_case', 'content usage')
+    compensation = license_params.get('compensation', 'negotiable')
 
-        # Validate response
-        valid, validation_message = _validate_analysis_response(result)
-        if not valid:
-            raise ValueError(f"Invalid LLM response: {validation_message}")
+    return {
+        'outreach_message': f"Hi {username}, I'm {your_name} from {your_organization}. We'd like to use your content for {use_case}. Please contact us to discuss licensing terms. Compensation: {compensation}",
+        'license_summary': f"Standard licensing terms for {use_case}. Territory: {license_params.get('territory', 'worldwide')}. Scope: {license_params.get('scope', 'single use')}.",
+        'next_steps': [
+            f"Contact {username} via {platform}",
+            "Negotiate licensing terms and compensation",
+            "Obtain written permission before use"
+        ],
+        'error': key_message
+    }
 
-        # Ensure confidence is int
-        result['confidence'] = int(result['confidence'])
 
-        # Ensure red_flags is a list
-        if 'red_flags' not in result:
-            result['red_flags'] = []
+def _outreach_after_error(e, owner_info, license_params):
+    """
+    Template outreach for a failed request
 
-        # Ensure probable_owner has confidence as int
-        if 'probable_owner' in result and 'confidence' in result['probable_owner']:
-            result['probable_owner']['confidence'] = int(result['probable_owner']['confidence'])
+    Args:
+        e: Exception raised while calling the API or parsing its response
+        owner_info: dict with username, platform
+        license_params: dict with use_case, territory, compensation
 
-        return result
+    Returns:
+        dict: Outreach-shaped fallback response
+    """
+    if isinstance(e, json.JSONDecodeError):
+        username = owner_info.get('username', 'content creator')
+        use_case = license_params.get('use_case', 'content usage')
 
-    except json.JSONDecodeError as e:
         return {
-            'confidence': 50,
-            'summary': 'Error parsing analysis results. Manual review required.',
-            'red_flags': [f'JSON parsing error: {str(e)}'],
-            'recommendation': 'manual_review',
-            'reasoning': 'LLM returned invalid JSON format',
-            'probable_owner': {
-                'username': 'Unknown',
-                'platform': 'Unknown',
-                'confidence': 0,
-                'contact_method': 'Manual investigation required'
-            },
+            'outreach_message': f"Hi {username}, We'd like to use your content for {use_case}. Please contact us to discuss licensing.",
+            'license_summary': "Standard licensing terms apply.",
+            'next_steps': [
+                "Contact content creator",
+                "Negotiate terms",
+                "Obtain written permission"
+            ],
             'error': f'JSON parsing failed: {str(e)}'
         }
 
-    except Exception as e:
-        error_str = str(e)
-
-        # Check for specific error types
-        if 'api_key' in error_str.lower() or 'authentication' in error_str.lower():
-            message = 'OpenAI API authentication failed - check API key'
-        elif 'rate_limit' in error_str.lower():
-            message = 'OpenAI API rate limit exceeded - try again later'
-        elif 'timeout' in error_str.lower():
-            message = 'OpenAI API request timed out'
-        else:
-            message = f'OpenAI API error: {error_str[:100]}'
-
-        return {
-            'confidence': 50,
-            'summary': 'Unable to complete automated analysis. Manual review required.',
-            'red_flags': [message],
-            'recommendation': 'manual_review',
-            'reasoning': 'LLM analysis failed due to API error',
-            'probable_owner': {
-                'username': 'Unknown',
-                'platform': 'Unknown',
-                'confidence': 0,
-                'contact_method': 'Manual investigation required'
-            },
-            'error': message
-        }
+    return _fallback_outreach(owner_info, license_params, _describe_api_error(e))
 
 
-def generate_outreach(owner_info, license_params, your_name='Metro News Desk Reporter', your_organization='Metro News Desk'):
+def generate_outreach(owner_info, license_params, your_name='Metro News Desk Reporter', your_organization='Metro News Desk', *, api_key=None):
     """
     Generate rights clearance outreach message using OpenAI
 
@@ -296,6 +1321,8 @@ def generate_outreach(owner_info, license_params, your_name='Metro News Desk Rep
 
         your_name: str - Name of person sending the message
         your_organization: str - Organization name
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+            ("" forces the fallback response without touching os.environ)
 
     Returns:
         dict: Outreach message and license summary
@@ -310,123 +1337,244 @@ def generate_outreach(owner_info, license_params, your_name='Metro News Desk Rep
                 ]
             }
 
-    Model: gpt-4o-mini
+    Model: OPENAI_OUTREACH_MODEL (default gpt-4o-mini)
     Temperature: 0.5 (slightly higher for natural language generation)
-    Uses JSON mode for structured outputs
+    Uses structured outputs (response_format=OUTREACH_RESPONSE_FORMAT)
     """
     # Check API key
-    key_valid, key_message = _check_api_key()
+    key_valid, key_message = _check_api_key(api_key)
     if not key_valid:
-        username = owner_info.get('username', 'content creator')
-        platform = owner_info.get('platform', 'platform')
-        use_case = license_params.get('use_case', 'content usage')
-        compensation = license_params.get('compensation', 'negotiable')
+        return _outreach_without_key(owner_info, license_params, your_name, your_organization, key_message)
 
-        return {
-            'outreach_message': f"Hi {username}, I'm {your_name} from {your_organization}. We'd like to use your content for {use_case}. Please contact us to discuss licensing terms. Compensation: {compensation}",
-            'license_summary': f"Standard licensing terms for {use_case}. Territory: {license_params.get('territory', 'worldwide')}. Scope: {license_params.get('scope', 'single use')}.",
-            'next_steps': [
-                f"Contact {username} via {platform}",
-                "Negotiate licensing terms and compensation",
-                "Obtain written permission before use"
-            ],
-            'error': key_message
-        }
+    try:
+        # Shared OpenAI client, or the outreach endpoint's
+        client = _outreach_client_for(api_key)
+        response = client.chat.completions.create(
+            **_outreach_request(owner_info, license_params, your_name, your_organization)
+        )
+        return _outreach_from_response(response)
+
+    except Exception as e:
+        # Generate fallback message
+        return _outreach_after_error(e, owner_info, license_params)
+
+
+async def generate_outreach_async(owner_info, license_params, your_name='Metro News Desk Reporter', your_organization='Metro News Desk', *, api_key=None):
+    """
+    Async variant of generate_outreach
+
+    Args:
+        owner_info: dict with username, platform
+        license_params: dict with use_case, scope, territory, compensation
+        your_name: str - Name of person sending the message
+        your_organization: str - Organization name
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+
+    Returns:
+        dict: Same structure as generate_outreach
+    """
+    key_valid, key_message = _check_api_key(api_key)
+    if not key_valid:
+        return _outreach_without_key(owner_info, license_params, your_name, your_organization, key_message)
 
     try:
-        # Initialize OpenAI client
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        client = _outreach_client_for(api_key, asynchronous=True)
+        response = await client.chat.completions.create(
+            **_outreach_request(owner_info, license_params, your_name, your_organization)
+        )
+        return _outreach_from_response(response)
 
-        # Build system message
-        system_message = """Generate a professional outreach message for UGC licensing.
+    except Exception as e:
+        return _outreach_after_error(e, owner_info, license_params)
 
-You will receive owner information, licensing parameters, and the sender's details. Generate:
-1. A friendly but professional outreach message (150 words max)
-2. A brief license summary explaining terms in plain language
-3. Next steps for the journalist
 
-Format as JSON:
-{
-  "outreach_message": "<message text>",
-  "license_summary": "<plain language summary>",
-  "next_steps": ["<step 1>", "<step 2>", "<step 3>"]
-}
+# Batch API states in which the job may still produce output
+_BATCH_PENDING_STATUSES = ('validating', 'in_progress', 'finalizing')
 
-Tone: Professional, respectful, clear about intent and compensation.
-The message should:
-- Include the sender's name and organization (no placeholders)
-- Address the creator respectfully
-- Clearly state intent to license content
-- Mention the use case
-- Reference compensation
-- Request written confirmation
-- Be friendly but professional"""
 
-        # Build user message
-        user_message = f"""Sender: {your_name} from {your_organization}
-Owner: {owner_info.get('username', 'content creator')} on {owner_info.get('platform', 'platform')}
-Use case: {license_params.get('use_case', 'content usage')}
-Scope: {license_params.get('scope', 'single use')}
-Territory: {license_params.get('territory', 'worldwide')}
-Compensation: {license_params.get('compensation', 'standard rate')}
+def generate_outreach_deferred(owner_info, license_params, your_name='Metro News Desk Reporter', your_organization='Metro News Desk', *, urgent=False, api_key=None):
+    """
+    Queue outreach generation on the OpenAI Batch API
 
-Generate the outreach message and license summary."""
+    Batch jobs cost half as much as synchronous calls but may take up to
+    24 hours, which suits drafts that wait for human review anyway. Collect
+    the result later with poll_outreach.
+
+    Args:
+        owner_info: dict with username, platform
+        license_params: dict with use_case, scope, territory, compensation
+        your_name: str - Name of person sending the message
+        your_organization: str - Organization name
+        urgent: bool - Generate synchronously (generate_outreach) instead;
+            always the case with OPENAI_OUTREACH_BASE_URL, since self-hosted
+            endpoints don't offer the Batch API
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+
+    Returns:
+        str: Batch ID to pass to poll_outreach, or
+        dict: The outreach itself when urgent, or a fallback (with 'error')
+        when the job couldn't be submitted
+    """
+    if urgent or os.getenv('OPENAI_OUTREACH_BASE_URL'):
+        return generate_outreach(owner_info, license_params, your_name, your_organization, api_key=api_key)
+
+    key_valid, key_message = _check_api_key(api_key)
+    if not key_valid:
+        return _outreach_without_key(owner_info, license_params, your_name, your_organization, key_message)
+
+    # Batch request bodies carry only API parameters
+    body = _outreach_request(owner_info, license_params, your_name, your_organization)
+    del body['timeout']
+    request_line = {
+        'custom_id': f'outreach-{uuid.uuid4().hex}',
+        'method': 'POST',
+        'url': '/v1/chat/completions',
+        'body': body
+    }
+
+    try:
+        client = _client_for(api_key)
+        input_file = client.files.create(
+            file=('outreach.jsonl', orjson.dumps(request_line) + b'\n'),
+            purpose='batch'
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        return batch.id
+
+    except Exception as e:
+        return _fallback_outreach(owner_info, license_params, _describe_api_error(e))
+
+
+def poll_outreach(batch_id, owner_info=None, license_params=None, *, api_key=None):
+    """
+    Fetch the result of a generate_outreach_deferred job
+
+    Args:
+        batch_id: str - ID returned by generate_outreach_deferred
+        owner_info: dict or None - Owner details for the fallback message
+        license_params: dict or None - License details for the fallback message
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+
+    Returns:
+        dict or None: The outreach (same structure as generate_outreach),
+        None while the job is still running, or a fallback with 'error'
+        if the job failed, expired or was cancelled
+    """
+    owner_info = owner_info or {}
+    license_params = license_params or {}
+
+    key_valid, key_message = _check_api_key(api_key)
+    if not key_valid:
+        return _fallback_outreach(owner_info, license_params, key_message)
+
+    try:
+        client = _client_for(api_key)
+        batch = client.batches.retrieve(batch_id)
+
+        if batch.status in _BATCH_PENDING_STATUSES:
+            return None
+        if batch.status != 'completed' or not batch.output_file_id:
+            return _fallback_outreach(owner_info, license_params, f'Outreach batch {batch.status}')
+
+        # One request per batch - its response is the first output line
+        output = client.files.content(batch.output_file_id).text
+        line = json.loads(output.splitlines()[0])
+        response = line.get('response') or {}
+        if response.get('status_code') != 200:
+            return _fallback_outreach(owner_info, license_params, f"Outreach batch request failed: {line.get('error')}")
+
+        return _outreach_from_content(response['body']['choices'][0]['message']['content'])
+
+    except Exception as e:
+        return _outreach_after_error(e, owner_info, license_params)
+
+
+def synthesize_and_outreach(signals, license_params, your_name='Metro News Desk Reporter', your_organization='Metro News Desk', *, api_key=None):
+    """
+    Analyze signals and draft the outreach message in a single OpenAI call
+
+    Equivalent to synthesize_analysis followed by generate_outreach for the
+    probable owner, but sends one request with a combined structured-output
+    schema instead of two sequential round-trips.
+
+    Args:
+        signals: dict with c2pa, exif, reverse_search data
+        license_params: dict with use_case, scope, territory, compensation
+        your_name: str - Name of person sending the message
+        your_organization: str - Organization name
+        api_key: str or None - OpenAI key to use; None reads OPENAI_API_KEY
+
+    Returns:
+        dict: {"analysis": <synthesize_analysis result>,
+               "outreach": <generate_outreach result>}
+
+    Model: OPENAI_ANALYSIS_MODEL (default gpt-4o-mini)
+    Uses structured outputs (response_format={"type": "json_schema", ...})
+    Temperature: 0.3
+    """
+    # Conclusive signals only need the outreach half from the model
+    decided = rules_analysis(signals)
+    if decided is not None:
+        return {
+            'analysis': decided,
+            'outreach': generate_outreach(decided['probable_owner'], license_params, your_name,
+                                          your_organization, api_key=api_key)
+        }
+
+    # Without a key both halves are local fallbacks - no network call
+    key_valid, _ = _check_api_key(api_key)
+    if not key_valid:
+        return {
+            'analysis': synthesize_analysis(signals, api_key=api_key),
+            'outreach': generate_outreach({}, license_params, your_name, your_organization,
+                                          api_key=api_key)
+        }
+
+    user_message = f"""Analyze these provenance signals:
+
+{_signals_section(signals)}
+
+Sender: {your_name} from {your_organization}
+{_license_section(license_params)}
+
+Provide the analysis and outreach as JSON."""
+
+    try:
+        client = _client_for(api_key)
 
-        # Call OpenAI API
         response = client.chat.completions.create(
-            model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+            model=_analysis_model(),
             messages=[
-                {"role": "system", "content": system_message},
+                _COMBINED_SYSTEM_MESSAGE,
                 {"role": "user", "content": user_message}
             ],
-            response_format={"type": "json_object"},
-            temperature=0.5,  # Higher for natural language
-            max_tokens=800,
+            response_format=COMBINED_RESPONSE_FORMAT,
+            temperature=ANALYSIS_TEMPERATURE,
+            max_tokens=ANALYSIS_MAX_TOKENS + OUTREACH_MAX_TOKENS,
             timeout=30.0
         )
 
-        # Parse response
-        result_text = response.choices[0].message.content
-        result = json.loads(result_text)
+        result = json.loads(_completion_content(response))
+        analysis = result.get('analysis', {})
+        outreach = result.get('outreach', {})
 
-        # Validate response
-        valid, validation_message = _validate_outreach_response(result)
+        # Strict mode fixes the shape; only the confidence range needs checking
+        valid, validation_message = _validate_analysis_response(analysis)
         if not valid:
             raise ValueError(f"Invalid LLM response: {validation_message}")
 
-        return result
-
-    except json.JSONDecodeError as e:
-        username = owner_info.get('username', 'content creator')
-        use_case = license_params.get('use_case', 'content usage')
-
         return {
-            'outreach_message': f"Hi {username}, We'd like to use your content for {use_case}. Please contact us to discuss licensing.",
-            'license_summary': "Standard licensing terms apply.",
-            'next_steps': [
-                "Contact content creator",
-                "Negotiate terms",
-                "Obtain written permission"
-            ],
-            'error': f'JSON parsing failed: {str(e)}'
+            'analysis': analysis,
+            'outreach': outreach
         }
 
     except Exception as e:
-        error_str = str(e)
-
-        # Generate fallback message
-        username = owner_info.get('username', 'content creator')
-        platform = owner_info.get('platform', 'platform')
-        use_case = license_params.get('use_case', 'content usage')
-        compensation = license_params.get('compensation', 'negotiable')
-
+        analysis = _analysis_after_error(e)
         return {
-            'outreach_message': f"Hi {username}, We'd like to use your content for {use_case}. Compensation: {compensation}. Please contact us to discuss licensing.",
-            'license_summary': f"Standard licensing for {use_case}. Territory: {license_params.get('territory', 'worldwide')}.",
-            'next_steps': [
-                f"Contact {username} via {platform}",
-                "Discuss and negotiate terms",
-                "Obtain written permission"
-            ],
-            'error': f'OpenAI API error: {error_str[:100]}'
+            'analysis': analysis,
+            'outreach': _fallback_outreach({}, license_params, analysis['error'])
         }
@@ -10,16 +10,318 @@ NOTE: This is a lightweight scraper for demonstration. Production would use
 a paid API (TinEye, Google Vision API) for reliability.
 """
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import quote_plus
+import os
+import copy
 import time
+import asyncio
+import threading
+import weakref
+import importlib.util
+from collections import OrderedDict
+import requests
+import httpx
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote_plus, urlparse
+from urllib3.util.retry import Retry
+
+
+# Browser-like request headers, shared by every search
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none'
+}
+
+SEARCH_TIMEOUT = 15  # seconds
+
+# Pooled keep-alive session for search_image. Rate-limit and server errors
+# are retried with jittered exponential backoff (0.5s, 1s, 2s); read
+# timeouts are not, so a slow search still fails after SEARCH_TIMEOUT.
+# The last response is returned as-is, so a persistent 429 is still reported.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.5,
+        backoff_jitter=0.25,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET'],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+))
+
+MAX_MATCHES = 5
+
+# Results pages are fed to the pull parser in slices, so parsing can stop
+# once the first MAX_MATCHES result divs are complete
+_FEED_CHUNK_SIZE = 64 * 1024
+
+# Completed searches by image URL, least recently used first. Errors (rate
+# limits, CAPTCHAs, timeouts) aren't cached so they are retried.
+URL_CACHE_SIZE = 1024
+URL_CACHE_TTL = int(os.getenv('REVERSE_SEARCH_CACHE_TTL', 3600))  # seconds
+_url_cache = OrderedDict()  # image_url -> (expires_at, result)
+_url_cache_lock = threading.Lock()
+
+# Async clients for search_image_async, one per event loop. HTTP/2 lets
+# concurrent searches share one connection; it needs the optional h2
+# package (pip install httpx[http2]) and falls back to HTTP/1.1 without it.
+MAX_CONCURRENT_SEARCHES = 10
+_HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+_async_clients = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def _search_url(image_url):
+    """Google reverse image search URL for an image URL"""
+    return f"https://www.google.com/searchbyimage?image_url={quote_plus(image_url)}&safe=off"
+
+
+def _cached_search(image_url):
+    """
+    Cached result for an image URL
+
+    Returns:
+        dict or None: A copy of the result (marked 'cached'), None on a miss
+    """
+    with _url_cache_lock:
+        entry = _url_cache.get(image_url)
+        if entry is None:
+            return None
+
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del _url_cache[image_url]
+            return None
+
+        _url_cache.move_to_end(image_url)
+
+    # Deep copy so callers can't modify the cached matches
+    return {**copy.deepcopy(result), 'cached': True}
+
+
+def _remember_search(image_url, result):
+    """Cache a completed search result; error results are skipped"""
+    if 'error' in result:
+        return
+
+    with _url_cache_lock:
+        _url_cache[image_url] = (time.monotonic() + URL_CACHE_TTL, copy.deepcopy(result))
+        _url_cache.move_to_end(image_url)
+        while len(_url_cache) > URL_CACHE_SIZE:
+            _url_cache.popitem(last=False)
+
+
+def clear_cache():
+    """Drop all cached search results"""
+    with _url_cache_lock:
+        _url_cache.clear()
+
+
+def _get_async_client():
+    """
+    Get the running event loop's httpx.AsyncClient, creating it on first use
+
+    Connections are bound to the loop that opened them, so each loop (e.g.
+    each asyncio.run() call) gets its own pooled client.
+    """
+    loop = asyncio.get_running_loop()
+
+    with _async_clients_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = httpx.AsyncClient(
+                # Connection is a hop-by-hop header HTTP/2 doesn't allow
+                headers={k: v for k, v in _HEADERS.items() if k != 'Connection'},
+                timeout=SEARCH_TIMEOUT,
+                follow_redirects=True,
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=MAX_CONCURRENT_SEARCHES)
+            )
+        return client
+
+
+def _match_from_div(div):
+    """
+    Match dict for one result div
+
+    Returns:
+        dict or None: url, domain and title; None without an absolute link
+    """
+    links = div.xpath('.//a[@href]')
+    if not links or not links[0].get('href', '').startswith('http'):
+        return None
+    url = links[0].get('href')
+
+    # Extract domain
+    try:
+        domain = urlparse(url).netloc
+    except Exception:
+        domain = "unknown"
+
+    # Extract title
+    title_elems = div.xpath('.//h3') or div.xpath('.//h2 | .//h4')
+    title = ''.join(t.strip() for t in title_elems[0].itertext()) if title_elems else "No title"
+
+    return {
+        'url': url,
+        'domain': domain,
+        'title': title
+    }
+
+
+def _scan_result_divs(text, limit=MAX_MATCHES):
+    """
+    Pull-parse a results page for its first result divs
+
+    Result divs are divs with class "g", or - when the page has none - divs
+    with a data-hveid attribute. Each is converted as soon as it closes, and
+    elements outside a pending result div are cleared, so memory stays
+    bounded and parsing stops early on long pages.
+
+    Args:
+        text: str - Results page HTML
+        limit: int - Number of result divs to convert
+
+    Returns:
+        list: _match_from_div result (dict or None) per result div, in
+        document order
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    g_slots, hveid_slots = [], []  # match (or None) per result div, in document order
+    pending = {}  # open result div -> [(slot list, index)]
+    open_g = 0  # open divs among the first `limit` class "g" divs
+
+    def handle(event, elem):
+        nonlocal open_g
+        if event == 'start':
+            if elem.tag != 'div':
+                return
+            slots = []
+            if len(g_slots) < limit and 'g' in (elem.get('class') or '').split():
+                g_slots.append(None)
+                slots.append((g_slots, len(g_slots) - 1))
+                open_g += 1
+            if len(hveid_slots) < limit and elem.get('data-hveid') is not None:
+                hveid_slots.append(None)
+                slots.append((hveid_slots, len(hveid_slots) - 1))
+            if slots:
+                pending[elem] = slots
+            return
+
+        slots = pending.pop(elem, None)
+        if slots:
+            match = _match_from_div(elem)
+            for slot_list, index in slots:
+                slot_list[index] = match
+                if slot_list is g_slots:
+                    open_g -= 1
+
+        # Content inside a pending result div is still needed
+        if not pending:
+            elem.clear()
+
+    for offset in range(0, len(text), _FEED_CHUNK_SIZE):
+        parser.feed(text[offset:offset + _FEED_CHUNK_SIZE])
+        for event, elem in parser.read_events():
+            handle(event, elem)
+        if len(g_slots) >= limit and not open_g:
+            return g_slots
+
+    parser.close()
+    for event, elem in parser.read_events():
+        handle(event, elem)
+
+    return g_slots or hveid_slots
+
+
+def _results_from_response(search_url, status_code, final_url, text):
+    """
+    Turn a search response into the search_image result
+
+    Args:
+        search_url: str - URL that was requested
+        status_code: int - HTTP status of the response
+        final_url: str - URL after redirects
+        text: str - Response body
+
+    Returns:
+        dict: search_image result
+    """
+    # Check for CAPTCHA or rate limiting
+    if status_code == 429:
+        return {
+            'found': False,
+            'error': 'Rate limit exceeded - too many requests',
+            'search_url': search_url
+        }
+
+    if status_code != 200:
+        return {
+            'found': False,
+            'error': f'Search failed with status {status_code}',
+            'search_url': search_url
+        }
+
+    # Check if Google blocked the request (CAPTCHA page)
+    if 'sorry/index' in final_url or 'recaptcha' in text.lower():
+        return {
+            'found': False,
+            'error': 'Google CAPTCHA detected - search unavailable via scraping',
+            'message': 'Production version would use paid API',
+            'search_url': search_url
+        }
+
+    # Try to extract search results from the first result divs
+    # Google's HTML structure changes frequently, so this is best-effort
+    matches = []
+    if text.strip():
+        try:
+            matches = [match for match in _scan_result_divs(text) if match]
+        except (etree.LxmlError, ValueError):
+            pass  # Unparseable body (e.g. binary junk) - treat it as no results
+
+    # If we found matches
+    if matches:
+        return {
+            'found': True,
+            'match_count': len(matches),
+            'earliest_match': matches[0],  # First result is typically most relevant
+            'all_matches': matches,
+            'search_url': search_url,
+            'note': 'Scraped results - production would use paid API for reliability'
+        }
+
+    # No matches found (or couldn't parse results)
+    # This could mean truly no matches, or Google's HTML changed
+    return {
+        'found': False,
+        'match_count': 0,
+        'message': 'No matches found or unable to parse results',
+        'search_url': search_url,
+        'note': 'Manual verification recommended - try search_url in browser'
+    }
 
 
 def search_image(image_url):
     """
     Perform reverse image search using Google
 
+    Completed searches are cached by image URL for URL_CACHE_TTL seconds;
+    cached results carry 'cached': True.
+
     Args:
         image_url: URL of image to search
 
@@ -64,123 +366,115 @@ def search_image(image_url):
             'error': 'Invalid image URL provided'
         }
 
+    cached = _cached_search(image_url)
+    if cached is not None:
+        return cached
+
+    search_url = _search_url(image_url)
+
     try:
-        # Construct Google reverse search URL
-        encoded_url = quote_plus(image_url)
-        search_url = f"https://www.google.com/searchbyimage?image_url={encoded_url}&safe=off"
-
-        # Set headers to mimic browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none'
+        # Make request with timeout
+        response = _session.get(search_url, headers=_HEADERS, timeout=SEARCH_TIMEOUT)
+        result = _results_from_response(search_url, response.status_code, response.url, response.text)
+        _remember_search(image_url, result)
+        return result
+
+    except requests.Timeout:
+        return {
+            'found': False,
+            'error': f'Search request timed out after {SEARCH_TIMEOUT} seconds',
+            'search_url': search_url
         }
 
-        # Make request with timeout
-        response = requests.get(search_url, headers=headers, timeout=15)
-
-        # Check for CAPTCHA or rate limiting
-        if response.status_code == 429:
-            return {
-                'found': False,
-                'error': 'Rate limit exceeded - too many requests',
-                'search_url': search_url
-            }
-
-        if response.status_code != 200:
-            return {
-                'found': False,
-                'error': f'Search failed with status {response.status_code}',
-                'search_url': search_url
-            }
-
-        # Check if Google blocked the request (CAPTCHA page)
-        if 'sorry/index' in response.url or 'recaptcha' in response.text.lower():
-            return {
-                'found': False,
-                'error': 'Google CAPTCHA detected - search unavailable via scraping',
-                'message': 'Production version would use paid API',
-                'search_url': search_url
-            }
-
-        # Parse HTML
-        soup = BeautifulSoup(response.text, 'lxml')
-
-        # Try to extract search results
-        # Google's HTML structure changes frequently, so this is best-effort
-        matches = []
-
-        # Look for search result links (common patterns)
-        # This is a simplified extraction - Google's structure varies
-        result_divs = soup.find_all('div', class_='g') or soup.find_all('div', {'data-hveid': True})
-
-        for div in result_divs[:5]:  # Limit to first 5 matches
-            link = div.find('a', href=True)
-            if link and link.get('href', '').startswith('http'):
-                url = link['href']
-
-                # Extract domain
-                try:
-                    from urllib.parse import urlparse
-                    domain = urlparse(url).netloc
-                except Exception:
-                    domain = "unknown"
-
-                # Extract title
-                title_elem = div.find('h3') or div.find(['h2', 'h4'])
-                title = title_elem.get_text(strip=True) if title_elem else "No title"
-
-                matches.append({
-                    'url': url,
-                    'domain': domain,
-                    'title': title
-                })
-
-        # If we found matches
-        if matches:
-            return {
-                'found': True,
-                'match_count': len(matches),
-                'earliest_match': matches[0],  # First result is typically most relevant
-                'all_matches': matches,
-                'search_url': search_url,
-                'note': 'Scraped results - production would use paid API for reliability'
-            }
-
-        # No matches found (or couldn't parse results)
-        # This could mean truly no matches, or Google's HTML changed
+    except requests.RequestException as e:
         return {
             'found': False,
-            'match_count': 0,
-            'message': 'No matches found or unable to parse results',
-            'search_url': search_url,
-            'note': 'Manual verification recommended - try search_url in browser'
+            'error': f'Network error: {str(e)}',
+            'search_url': search_url
         }
 
-    except requests.Timeout:
+    except Exception as e:
         return {
             'found': False,
-            'error': 'Search request timed out after 15 seconds',
-            'search_url': search_url if 'search_url' in locals() else None
+            'error': f'Unexpected error during reverse search: {str(e)}',
+            'search_url': search_url
         }
 
-    except requests.RequestException as e:
+
+async def search_image_async(image_url):
+    """
+    Async variant of search_image
+
+    Awaits the request on a shared httpx.AsyncClient, so the search can
+    overlap with other pipeline work (EXIF, C2PA, other searches) in one
+    event loop. The HTML parse runs in a worker thread to keep the loop free.
+
+    Args:
+        image_url: URL of image to search
+
+    Returns:
+        dict: Same structure as search_image
+    """
+    if not image_url or not isinstance(image_url, str):
+        return {
+            'found': False,
+            'error': 'Invalid image URL provided'
+        }
+
+    cached = _cached_search(image_url)
+    if cached is not None:
+        return cached
+
+    search_url = _search_url(image_url)
+
+    try:
+        response = await _get_async_client().get(search_url)
+        result = await asyncio.to_thread(
+            _results_from_response, search_url, response.status_code, str(response.url), response.text
+        )
+        _remember_search(image_url, result)
+        return result
+
+    except httpx.TimeoutException:
+        return {
+            'found': False,
+            'error': f'Search request timed out after {SEARCH_TIMEOUT} seconds',
+            'search_url': search_url
+        }
+
+    except httpx.HTTPError as e:
         return {
             'found': False,
             'error': f'Network error: {str(e)}',
-            'search_url': search_url if 'search_url' in locals() else None
+            'search_url': search_url
         }
 
     except Exception as e:
         return {
             'found': False,
             'error': f'Unexpected error during reverse search: {str(e)}',
-            'search_url': search_url if 'search_url' in locals() else None
+            'search_url': search_url
         }
+
+
+async def search_images_async(image_urls):
+    """
+    Reverse search several images concurrently
+
+    At most MAX_CONCURRENT_SEARCHES requests are in flight at once, so a
+    large batch doesn't wait on the connection pool (or trip rate limits
+    all at once).
+
+    Args:
+        image_urls: list of image URLs
+
+    Returns:
+        list: search_image-shaped result per URL, in order
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+    async def search(image_url):
+        async with semaphore:
+            return await search_image_async(image_url)
+
+    return await asyncio.gather(*(search(image_url) for image_url in image_urls))